@@ -4,6 +4,7 @@ from sys import exit
 from loguru import logger
 
 from src.config import Config
+from src.models import SenderInventoryCache
 from src.orchestrator import TradeOrchestrator
 from src.services import (
     DataAccessService,
@@ -11,6 +12,12 @@ from src.services import (
     SteamParseService,
     TradePlanningService,
     OptimizerService,
+    LoginGovernor,
+    MetricsService,
+    RateLimiterService,
+    RunJournal,
+    SessionCache,
+    SessionStore,
     ConsoleUI,
 )
 
@@ -30,7 +37,7 @@ class Program:
                 f"Configuration loaded | "
                 f"senders={len(self._senders)} | "
                 f"acceptors={len(self._acceptors)} | "
-                f"proxies={self._proxies.qsize()}"
+                f"proxies={len(self._proxies)}"
             )
         except Exception as ex:
             logger.exception(ex)
@@ -40,7 +47,30 @@ class Program:
     def run(self):
         logger.info("Starting trade distribution process")
 
-        steam_service = SteamService()
+        rate_limiter = RateLimiterService(
+            burst=self._config.program_settings.send_trades_burst,
+            refill_interval=self._config.program_settings.send_trades_delay,
+        )
+        metrics = MetricsService()
+        steam_service = SteamService(
+            rate_limiter=rate_limiter,
+            metrics=metrics,
+            session_store=SessionStore(),
+            login_governor=LoginGovernor(
+                concurrency=self._config.program_settings.login_concurrency,
+                per_minute=self._config.program_settings.logins_per_minute,
+                per_minute_per_proxy=self._config.program_settings.logins_per_minute_per_proxy,
+            ),
+            http2=self._config.program_settings.http2,
+            session_cache=SessionCache(
+                max_sessions=self._config.program_settings.max_live_sessions,
+                max_idle=self._config.program_settings.session_idle_timeout,
+                metrics=metrics,
+            ),
+            inventory_backend=self._config.program_settings.inventory_backend,
+            inventory_cache=SenderInventoryCache.load(path="data/inventories.json"),
+            inventory_cache_ttl=self._config.program_settings.inventory_cache_ttl,
+        )
         steamparse_service = SteamParseService(
             base_url=self._config.steam_parse.url,
             bearer_token=self._config.steam_parse.bearer_token,
@@ -56,6 +86,8 @@ class Program:
             steamparse_service=steamparse_service,
             trade_planning=trade_planning,
             proxies=self._proxies,
+            journal=RunJournal(max_age=self._config.program_settings.journal_max_age),
+            metrics=metrics,
         )
 
         try:
@@ -1,5 +1,6 @@
 import sys
 from pathlib import Path
+from typing import Literal
 
 from pydantic import (
     BaseModel,
@@ -12,6 +13,31 @@ from src.exceptions import ConfigError
 class ProgramSettings(BaseModel):
     perform_trade_offer_attempts: int = Field(alias="PerformTradeOfferAttempts", ge=1, le=10)
     send_trades_delay: int = Field(alias="SendTradesDelay", ge=1)
+    send_trades_burst: int = Field(alias="SendTradesBurst", default=1, ge=1)
+    workers: int = Field(alias="Workers", default=1, ge=1)
+    max_offers_per_sender: int = Field(alias="MaxOffersPerSender", default=1, ge=1)
+    prefetch_acceptors: int = Field(alias="PrefetchAcceptors", default=2, ge=1)
+    prepare_concurrency: int = Field(alias="PrepareConcurrency", default=10, ge=1)
+    prepare_concurrency_per_proxy: int = Field(
+        alias="PrepareConcurrencyPerProxy", default=2, ge=1
+    )
+    metrics_interval: int = Field(alias="MetricsInterval", default=60, ge=0)
+    keepalive_interval: int = Field(alias="KeepaliveInterval", default=300, ge=0)
+    login_concurrency: int = Field(alias="LoginConcurrency", default=5, ge=1)
+    logins_per_minute: float = Field(alias="LoginsPerMinute", default=60, gt=0)
+    logins_per_minute_per_proxy: float = Field(
+        alias="LoginsPerMinutePerProxy", default=6, gt=0
+    )
+    http2: bool = Field(alias="HTTP2", default=False)
+    max_live_sessions: int = Field(alias="MaxLiveSessions", default=500, ge=1)
+    session_idle_timeout: int = Field(alias="SessionIdleTimeout", default=900, ge=1)
+    warm_acceptors: int = Field(alias="WarmAcceptors", default=8, ge=0)
+    warm_idle_timeout: int = Field(alias="WarmIdleTimeout", default=300, ge=1)
+    inventory_backend: Literal["paginated", "legacy"] = Field(
+        alias="InventoryBackend", default="paginated"
+    )
+    inventory_cache_ttl: int = Field(alias="InventoryCacheTTL", default=3600, ge=0)
+    journal_max_age: int = Field(alias="JournalMaxAge", default=21600, ge=1)
 
 
 class SteamParseSettings(BaseModel):
@@ -28,6 +54,7 @@ class TradeSettings(BaseModel):
     count_acceptor_wallet: bool = Field(alias="CountAcceptorWallet", default=True)
     items_whitelist: list[str] | None = Field(alias="ItemsWhitelist", default=None)
     items_blacklist: list[str] | None = Field(alias="ItemsBlacklist", default=None)
+    planning_mode: Literal["greedy", "batch"] = Field(alias="PlanningMode", default="greedy")
 
 
 class Config(BaseModel):
@@ -1,48 +1,119 @@
 import json
+from array import array
+from collections.abc import Iterable
 from pathlib import Path
+from time import time
+from typing import Annotated, ClassVar
 
+from loguru import logger
 from pydantic import (
     BaseModel,
     Field,
-    model_validator,
+    PlainSerializer,
+    PlainValidator,
     ConfigDict,
 )
 
 from src.exceptions import DatabaseError
+from src.steam import (
+    Inventory,
+    Item,
+)
+
+
+class PricedInventory:
+    """Priced rows of an inventory, most expensive first."""
 
+    FEE_PERCENT = 0.13
 
-class PricedItem(BaseModel):
-    market_hash_name: str
-    app_id: int
-    context_id: int
-    asset_id: int
-    class_id: int
-    amount: int
-    price: float
-    fee_percent: float = 0.13
-    net_price: float = 0.0
+    def __init__(
+        self,
+        inventory: Inventory,
+        rows: Iterable[int] = (),
+        prices: Iterable[float] = (),
+        cents: Iterable[int] = (),
+    ):
+        self.inventory = inventory
+        self.rows = array("L", rows)
+        self.prices = array("d", prices)
+        self.cents = array("q", cents)
 
-    @model_validator(mode="after")
-    def _compute_net(self):
-        self.net_price = self.price * max(0.0, 1.0 - self.fee_percent)
-        return self
+    def __len__(self) -> int:
+        return len(self.rows)
 
     @classmethod
-    def from_item(cls, item, price: float) -> "PricedItem":
-        return cls(
-            market_hash_name=item.market_hash_name,
-            app_id=item.app_id,
-            context_id=item.context_id,
-            asset_id=item.asset_id,
-            class_id=item.class_id,
-            amount=item.amount,
-            price=price,
+    def net_price(cls, price: float) -> float:
+        return price * max(0.0, 1.0 - cls.FEE_PERCENT)
+
+    @property
+    def net_total(self) -> float:
+        return sum(map(self.net_price, self.prices))
+
+    def take(self, positions: Iterable[int]) -> "PricedInventory":
+        positions = list(positions)
+        return PricedInventory(
+            inventory=self.inventory,
+            rows=map(self.rows.__getitem__, positions),
+            prices=map(self.prices.__getitem__, positions),
+            cents=map(self.cents.__getitem__, positions),
         )
 
+    def assets(self) -> list[tuple[int, int]]:
+        inv = self.inventory
+        return [(inv.asset_ids[row], inv.class_ids[row]) for row in self.rows]
+
+    def select(self, assets: set[tuple[int, int]]) -> "PricedInventory":
+        return self.take(i for i, asset in enumerate(self.assets()) if asset in assets)
+
+    def without(self, assets: set[tuple[int, int]]) -> "PricedInventory":
+        return self.take(i for i, asset in enumerate(self.assets()) if asset not in assets)
+
+    def sort(self) -> "PricedInventory":
+        return self.take(sorted(range(len(self)), key=self.prices.__getitem__, reverse=True))
+
+    def merge(self, other: "PricedInventory") -> "PricedInventory":
+        merged = PricedInventory(
+            inventory=self.inventory,
+            rows=self.rows + other.rows,
+            prices=self.prices + other.prices,
+            cents=self.cents + other.cents,
+        )
+        return merged.sort()
+
+    def extend(self, other: "PricedInventory"):
+        """Append rows of another inventory in place, leaving them unsorted."""
+        offset = len(self.inventory)
+        self.inventory.extend(other.inventory.take(other.rows))
+        self.rows.extend(range(offset, len(self.inventory)))
+        self.prices.extend(other.prices)
+        self.cents.extend(other.cents)
+
+    def to_items(self) -> list[Item]:
+        return self.inventory.to_items(self.rows)
+
+    def to_dict(self) -> dict:
+        return {
+            "inventory": self.inventory.take(self.rows).to_dict(),
+            "prices": self.prices.tolist(),
+            "cents": self.cents.tolist(),
+        }
+
+    @classmethod
+    def coerce(cls, value) -> "PricedInventory":
+        if isinstance(value, cls):
+            return value
+        try:
+            inventory = Inventory.from_dict(value["inventory"])
+            return cls(inventory, range(len(inventory)), value["prices"], value["cents"])
+        except (KeyError, TypeError) as ex:
+            raise ValueError(f"Unsupported priced inventory format: {ex!r}") from ex
+
 
 class Selection(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     total: float
-    items: list[PricedItem]
+    items: PricedInventory
     item_count: int
 
 
@@ -55,6 +126,10 @@ class Proxy(BaseModel):
     def to_format(self) -> str:
         return f"http://{self.username}:{self.password}@{self.host}:{self.port}"
 
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
     @classmethod
     def from_string(cls, line: str) -> "Proxy":
         parts = line.split(":")
@@ -106,6 +181,47 @@ class Account(BaseModel):
         )
 
 
+class AcceptorJob(BaseModel):
+    account: Account
+    attempts: int
+    proxy: Proxy | None = None
+    missing: float = 0.0
+    partner_steam_id64: int | None = None
+    partner_trade_token: str | None = None
+    reservation: tuple[str, Selection] | None = None
+    offer_id: int | None = None
+    warmed_at: float | None = None
+    failed_sender: str | None = None
+
+
+class JournalOffer(BaseModel):
+    sender: str
+    offer_id: int
+    partner_steam_id64: int
+    assets: list[tuple[int, int]]
+
+
+StoredInventory = Annotated[
+    Inventory,
+    PlainValidator(Inventory.coerce),
+    PlainSerializer(Inventory.to_dict),
+]
+StoredPricedInventory = Annotated[
+    PricedInventory,
+    PlainValidator(PricedInventory.coerce),
+    PlainSerializer(PricedInventory.to_dict),
+]
+
+
+class JournalState(BaseModel):
+    prepared_at: float = 0.0
+    priced_by_sender: dict[str, StoredPricedInventory]
+    price_dict: dict[str, float]
+    currency_rates: dict[int, float]
+    removed: dict[str, set[tuple[int, int]]] = Field(default_factory=dict)
+    pending: dict[str, JournalOffer] = Field(default_factory=dict)
+
+
 class TradeCredentialsEntry(BaseModel):
     steam_id64: int
     token: str
@@ -148,6 +264,98 @@ class TradeCredentialsCache(BaseModel):
             self._path.write_text(self.model_dump_json(indent=2, exclude={"_path"}))
 
 
+class InventoryCacheEntry(BaseModel):
+    fetched_at: float
+    total: int
+    head: list[int]
+    items: StoredInventory
+
+
+class SenderInventoryCache(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    HEAD_SIZE: ClassVar[int] = 100
+
+    _path: Path | None = None
+    data: dict[str, InventoryCacheEntry] = Field(default_factory=dict)
+    owners: dict[str, int] = Field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "SenderInventoryCache":
+        p = Path(path)
+        try:
+            cache = cls.model_validate_json(p.read_text()) if p.exists() else cls()
+        except ValueError:
+            logger.warning(f"Inventory cache at {p} is unreadable or outdated, discarding it")
+            cache = cls()
+        cache._path = p
+        return cache
+
+    @staticmethod
+    def _key(steam_id64: int, app_id: int, context_id: int) -> str:
+        return f"{steam_id64}:{app_id}:{context_id}"
+
+    def get(
+        self,
+        steam_id64: int,
+        app_id: int,
+        context_id: int,
+        ttl: float,
+    ) -> InventoryCacheEntry | None:
+        entry = self.data.get(self._key(steam_id64, app_id, context_id))
+        if entry is None or time() - entry.fetched_at > ttl:
+            return None
+        return entry
+
+    def set(
+        self,
+        username: str,
+        steam_id64: int,
+        app_id: int,
+        context_id: int,
+        items: Inventory,
+        total: int,
+        head: list[int],
+    ):
+        self.owners[username] = steam_id64
+        self.data[self._key(steam_id64, app_id, context_id)] = InventoryCacheEntry(
+            fetched_at=time(),
+            total=total,
+            head=head,
+            items=items,
+        )
+
+    def discard(self, steam_id64: int, app_id: int, context_id: int):
+        self.data.pop(self._key(steam_id64, app_id, context_id), None)
+
+    def remove(
+        self,
+        username: str,
+        app_id: int,
+        context_id: int,
+        assets: list[tuple[int, int]],
+    ):
+        steam_id64 = self.owners.get(username)
+        entry = self.data.get(self._key(steam_id64, app_id, context_id))
+        if entry is None:
+            return
+        removed = {asset_id for asset_id, _ in assets}
+        kept = entry.items.without(removed)
+        entry.total -= len(entry.items) - len(kept)
+        entry.items = kept
+        entry.head = [asset_id for asset_id in entry.head if asset_id not in removed]
+
+    @staticmethod
+    def is_fresh(entry: InventoryCacheEntry, total: int | None, head: list[int]) -> bool:
+        if total is not None and total != entry.total:
+            return False
+        return head[:len(entry.head)] == entry.head
+
+    def save(self):
+        if self._path:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._path.write_text(self.model_dump_json(exclude={"_path"}))
+
+
 class ProgressStats(BaseModel):
     progress: int
     total: int
@@ -1,4 +1,12 @@
 import asyncio
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from math import ceil
+from time import (
+    monotonic,
+    perf_counter,
+    time,
+)
 
 from loguru import logger
 
@@ -6,19 +14,30 @@ from src.config import Config
 from src.exceptions import TargetNotReachable
 from src.models import (
     Account,
-    PricedItem,
+    AcceptorJob,
+    JournalOffer,
+    JournalState,
+    PricedInventory,
+    Selection,
 )
 from src.services import (
+    ConcurrencyLimiter,
+    MetricsService,
+    ProxyPool,
     TradePlanningService,
     ResultsService,
+    RetryScheduler,
+    RunJournal,
     SteamService,
     SteamParseService,
 )
-from src.steam import Item
+from src.steam import Inventory
 from src.steamparse import Game
 
 
 class TradeOrchestrator:
+    PREPARE_QUEUE_PAGES = 2
+
     def __init__(
         self,
         config: Config,
@@ -27,193 +46,570 @@ class TradeOrchestrator:
         steam_service: SteamService,
         steamparse_service: SteamParseService,
         trade_planning: TradePlanningService,
-        proxies: asyncio.Queue,
+        proxies: ProxyPool,
+        journal: RunJournal | None = None,
+        metrics: MetricsService | None = None,
+        retry_scheduler: RetryScheduler | None = None,
     ):
         self._config = config
         self._senders = senders
         self._senders_by_name = {s.username: s for s in senders}
         self._acceptors = acceptors
         self._steam = steam_service
+        self._steam.prioritize(senders)
         self._steamparse = steamparse_service
         self._planning = trade_planning
         self._results = ResultsService(len(acceptors))
-        self._priced_by_sender: dict[str, list[PricedItem]] = {}
-        self._original_by_sender: dict[str, dict[tuple[int, int], Item]] = {}
+        self._priced_by_sender: dict[str, PricedInventory] = {}
         self._price_dict: dict[str, float] = {}
         self._currency_rates: dict[int, float] = {}
         self._proxies = proxies
+        self._journal = journal
+        self._metrics = metrics or MetricsService()
+        self._retries = retry_scheduler or RetryScheduler()
+        self._sender_slots = {
+            s.username: asyncio.Semaphore(config.program_settings.max_offers_per_sender)
+            for s in senders
+        }
 
     async def _prepare_data(self) -> None:
         logger.info(f"Preparing data for {len(self._acceptors)} accounts")
 
-        logger.debug("Checking sender inventories")
-        tasks = [
-            self._steam.fetch_inventory(
-                account=s,
-                app_id=self._config.trade_settings.app_id,
-                context_id=self._config.trade_settings.context_id,
+        logger.debug("Checking sender inventories, market prices and exchange rates")
+        ts = self._config.trade_settings
+        ps = self._config.program_settings
+        price_task = asyncio.create_task(self._steamparse.fetch_price_dictionary(game=Game.CSGO))
+        rates_task = asyncio.create_task(self._steamparse.fetch_currency_rates())
+        limiter = ConcurrencyLimiter(
+            limit=ps.prepare_concurrency,
+            per_key_limit=ps.prepare_concurrency_per_proxy,
+        )
+        checked = 0
+
+        def skip(sender: Account, ex: Exception) -> None:
+            self._priced_by_sender.pop(sender.username, None)
+            logger.error(
+                f"{sender.username} | {ex.__class__.__name__} | "
+                f"Inventory unavailable, account skipped"
             )
-            for s in self._senders
-        ]
-        inventories = await asyncio.gather(*tasks)
-        inventories = [(s.username, inv) for s, inv in zip(self._senders, inventories)]
 
-        for username, items in inventories:
-            logger.debug(f"{username} | {len(items)} items available")
-        logger.debug(f"All inventories checked")
+        async def fetch(sender: Account, queue: asyncio.Queue) -> None:
+            key = sender.proxy.address if sender.proxy else ""
+            try:
+                async with limiter.slot(key):
+                    await self._steam.warm_up(sender)
+                available = 0
+                async with aclosing(
+                    self._steam.iter_inventory(
+                        account=sender,
+                        app_id=ts.app_id,
+                        context_id=ts.context_id,
+                        cached=True,
+                    )
+                ) as inventory:
+                    while True:
+                        async with limiter.slot(key):
+                            page = await anext(inventory, None)
+                        if page is None:
+                            break
+                        available += len(page)
+                        await queue.put((sender.username, page))
+                logger.debug(f"{sender.username} | {available} items available")
+            except Exception as ex:
+                await queue.put(ex)
+            else:
+                await queue.put(None)
+
+        async def drain(queue: asyncio.Queue) -> AsyncIterator[tuple[str, Inventory]]:
+            while (page := await queue.get()) is not None:
+                if isinstance(page, Exception):
+                    raise page
+                yield page
+
+        async def prepare(sender: Account) -> None:
+            nonlocal checked
+            # A slot is held per page request, and the bounded queue makes fetching
+            # wait for pricing, so a sender never has more than a few pages in memory.
+            queue = asyncio.Queue(maxsize=self.PREPARE_QUEUE_PAGES)
+            fetcher = asyncio.create_task(fetch(sender, queue))
+            try:
+                price_dict = await price_task
+                try:
+                    await self._planning.build_price_index(
+                        inventories=drain(queue),
+                        price_dict=price_dict,
+                        items_whitelist=ts.items_whitelist,
+                        items_blacklist=ts.items_blacklist,
+                        index=self._priced_by_sender,
+                    )
+                except Exception as ex:
+                    skip(sender, ex)
+            finally:
+                fetcher.cancel()
+            checked += 1
+            logger.debug(f"Inventories checked {checked}/{len(self._senders)}")
+
+        tasks = [asyncio.create_task(prepare(s)) for s in self._senders]
+        try:
+            await asyncio.gather(*tasks)
+            self._price_dict = await price_task
+            self._currency_rates = await rates_task
+        except BaseException:
+            for task in [price_task, rates_task, *tasks]:
+                task.cancel()
+            raise
+        finally:
+            await self._steamparse.close()
 
-        logger.debug("Getting current market prices")
-        self._price_dict = await self._steamparse.fetch_price_dictionary(game=Game.CSGO)
         logger.debug(f"Market prices received | {len(self._price_dict)} items")
+        logger.debug(f"Exchange rates received | {len(self._currency_rates)} currencies")
 
-        self._priced_by_sender, self._original_by_sender = (
-            self._planning.build_price_index(
-                inventories=inventories,
-                price_dict=self._price_dict,
-                items_whitelist=self._config.trade_settings.items_whitelist,
-                items_blacklist=self._config.trade_settings.items_blacklist,
-            )
-        )
         total_priced = sum(len(v) for v in self._priced_by_sender.values())
         logger.info(
             f"Ready to distribute {total_priced} items from "
             f"{len(self._priced_by_sender)} accounts"
         )
+        self._results.update_balance(self._priced_by_sender)
 
+        await self._record(
+            "prepared",
+            prepared_at=time(),
+            priced_by_sender={
+                sender: items.to_dict() for sender, items in self._priced_by_sender.items()
+            },
+            price_dict=self._price_dict,
+            currency_rates=self._currency_rates,
+        )
+
+    def _restore(self, state: JournalState) -> dict[str, JournalOffer]:
+        self._price_dict = state.price_dict
+        self._currency_rates = state.currency_rates
+        for sender, items in state.priced_by_sender.items():
+            if sender not in self._senders_by_name:
+                logger.warning(f"{sender} | Sender no longer configured, journaled items dropped")
+                continue
+            self._priced_by_sender[sender] = items.without(state.removed.get(sender, set()))
+
+        pending = {}
+        for acceptor, offer in state.pending.items():
+            if offer.sender not in self._priced_by_sender:
+                logger.warning(
+                    f"{acceptor} | Trade offer #{offer.offer_id} from unknown sender "
+                    f"{offer.sender} dropped"
+                )
+                continue
+            pending[acceptor] = offer
+
+        total_priced = sum(len(v) for v in self._priced_by_sender.values())
+        logger.info(
+            f"Run restored from journal | {total_priced} items from "
+            f"{len(self._priced_by_sender)} accounts | "
+            f"{len(pending)} offers pending"
+        )
         self._results.update_balance(self._priced_by_sender)
+        return pending
 
-        logger.debug("Getting currency exchange rates")
-        self._currency_rates = await self._steamparse.fetch_currency_rates()
-        await self._steamparse.close()
-        logger.debug(f"Exchange rates received | {len(self._currency_rates)} currencies")
+    def _resume_offer(self, job: AcceptorJob, offer: JournalOffer) -> None:
+        items = self._priced_by_sender[offer.sender].select(set(offer.assets))
+        selection = Selection(
+            total=self._planning.estimate_value(items),
+            items=items,
+            item_count=len(items),
+        )
+        job.reservation = self._reserve(offer.sender, selection)
+        job.offer_id = offer.offer_id
+        job.partner_steam_id64 = offer.partner_steam_id64
+        logger.debug(f"{job.account.username} | Resuming trade offer #{offer.offer_id}")
+
+    async def _record(self, event: str, **data) -> None:
+        if self._journal is not None:
+            await self._journal.record(event, **data)
+
+    def _reserve(self, sender_name: str, selection: Selection) -> tuple[str, Selection]:
+        self._planning.remove_used(
+            priced_by_sender=self._priced_by_sender,
+            sender_name=sender_name,
+            selection=selection,
+        )
+        return sender_name, selection
+
+    def _release(self, sender_name: str, selection: Selection) -> None:
+        self._planning.restore_used(
+            priced_by_sender=self._priced_by_sender,
+            sender_name=sender_name,
+            selection=selection,
+        )
 
-    async def _process_acceptor(self, acceptor: Account) -> None:
+    async def _evaluate(self, job: AcceptorJob) -> bool:
         ts = self._config.trade_settings
-        attempts = self._config.program_settings.perform_trade_offer_attempts
+        acceptor = job.account
 
-        try:
-            while attempts > 0:
-                proxy = await self._proxies.get()
+        items, wallet_total, wallet_currency = await self._steam.fetch_inventory_and_wallet(
+            account=acceptor,
+            app_id=ts.app_id,
+            context_id=ts.context_id,
+        )
+
+        items_value = 0.0
+        if ts.count_acceptor_inventory:
+            priced = self._planning.price_inventory(items=items, price_dict=self._price_dict)
+            items_value = self._planning.estimate_value(priced)
+
+        wallet_usd = 0.0
+        if ts.count_acceptor_wallet:
+            wallet_usd = self._planning.wallet_to_usd(
+                wallet_total=wallet_total,
+                wallet_currency=wallet_currency,
+                currency_rates=self._currency_rates,
+            )
+
+        current = items_value + wallet_usd
+        logger.debug(
+            f"{acceptor.username} | inv={items_value:.2f} | "
+            f"wallet={wallet_usd:.2f} | "
+            f"current={current:.2f} | "
+            f"target={ts.target:.2f}"
+        )
+
+        if current >= ts.target:
+            logger.info(f"{acceptor.username} | Already has target amount ${ts.target:.2f}")
+            return False
+
+        job.missing = ts.target - current
+        job.partner_steam_id64, job.partner_trade_token = (
+            await self._steam.get_trade_credentials(account=acceptor)
+        )
+        return True
+
+    async def _plan_batch(self, jobs: list[AcceptorJob]) -> list[AcceptorJob]:
+        logger.info(f"Collecting deficits of {len(jobs)} accounts for batch planning")
+        slots = asyncio.Semaphore(
+            self._worker_count() + self._config.program_settings.prefetch_acceptors
+        )
+
+        async def collect(job: AcceptorJob) -> bool | None:
+            async with slots:
+                proxy = await self._proxies.acquire()
+                job.account.proxy = proxy
+                started = perf_counter()
+                success, latency, needs_trade = True, None, None
                 try:
-                    acceptor.proxy = proxy
-                    await self._steam.close_session(acceptor)
-
-                    items, wallet_total, wallet_currency = (
-                        await self._steam.fetch_inventory_and_wallet(
-                            account=acceptor,
-                            app_id=ts.app_id,
-                            context_id=ts.context_id,
-                        )
+                    await self._steam.close_session(job.account)
+                    needs_trade = await self._evaluate(job)
+                    latency = perf_counter() - started
+                except Exception as ex:
+                    logger.warning(
+                        f"{job.account.username} | {ex.__class__.__name__} | "
+                        f"Left for regular planning"
                     )
+                    success = False if self._proxies.is_proxy_fault(ex) else None
+                finally:
+                    await self._steam.close_session(job.account)
+                    await self._proxies.release(proxy, success=success, latency=latency)
+                return needs_trade
 
-                    items_value = 0.0
-                    if ts.count_acceptor_inventory:
-                        priced = [
-                            PricedItem.from_item(it, price)
-                            for it in items
-                            if (price := self._price_dict.get(it.market_hash_name, 0)) > 0
-                        ]
-                        items_value = self._planning.estimate_value(priced)
-
-                    wallet_usd = 0.0
-                    if ts.count_acceptor_wallet:
-                        wallet_usd = self._planning.wallet_to_usd(
-                            wallet_total=wallet_total,
-                            wallet_currency=wallet_currency,
-                            currency_rates=self._currency_rates,
-                        )
-
-                    current = items_value + wallet_usd
-                    logger.debug(
-                        f"{acceptor.username} | inv={items_value:.2f} | "
-                        f"wallet={wallet_usd:.2f} | "
-                        f"current={current:.2f} | "
-                        f"target={ts.target:.2f}"
-                    )
+        unplanned = [job for job in jobs if job.reservation is None]
+        results = await asyncio.gather(*(collect(job) for job in unplanned))
 
-                    if current >= ts.target:
-                        logger.info(
-                            f"{acceptor.username} | Already has target amount ${ts.target:.2f}"
-                        )
-                        self._results.success(acceptor)
-                        return
-
-                    missing = ts.target - current
-                    sender_name, selection = self._planning.select_best_sender(
-                        priced_by_sender=self._priced_by_sender,
-                        target=missing,
-                    )
+        deficits = {}
+        remaining = [job for job in jobs if job.reservation is not None]
+        for job, needs_trade in zip(unplanned, results):
+            if needs_trade is False:
+                await self._finish(job)
+                continue
+            if needs_trade:
+                deficits[job.account.username] = job.missing
+            remaining.append(job)
 
-                    sender = self._senders_by_name[sender_name]
-                    logger.info(
-                        f"{acceptor.username} | Sending {selection.item_count} items "
-                        f"(${selection.total:.2f}) from {sender_name}"
-                    )
+        with self._metrics.stage("optimizer"):
+            plan = self._planning.plan_batch(
+                priced_by_sender=self._priced_by_sender,
+                deficits=deficits,
+            )
+        for job in unplanned:
+            if assignment := plan.get(job.account.username):
+                job.reservation = self._reserve(*assignment)
 
-                    chosen_items = self._planning.to_original(
-                        selection=selection,
-                        original_index=self._original_by_sender[sender_name]
-                    )
+        logger.info(f"Batch plan ready | {len(plan)}/{len(deficits)} accounts covered")
+        return remaining
 
-                    partner_id, partner_token = await self._steam.get_trade_credentials(
-                        account=acceptor
-                    )
-                    offer_id = await self._steam.send_trade_offer(
+    async def _trade(self, job: AcceptorJob) -> None:
+        acceptor = job.account
+        if job.reservation is None:
+            with self._metrics.stage("optimizer", account=acceptor.username):
+                sender_name, selection = self._planning.select_best_sender(
+                    priced_by_sender=self._priced_by_sender,
+                    target=job.missing,
+                )
+            job.reservation = self._reserve(sender_name, selection)
+
+        sender_name, selection = job.reservation
+        sender = self._senders_by_name[sender_name]
+        logger.info(
+            f"{acceptor.username} | Sending {selection.item_count} items "
+            f"(${selection.total:.2f}) from {sender_name}"
+        )
+
+        assets = selection.items.assets()
+        sending = job.offer_id is None
+        try:
+            async with self._sender_slots[sender_name], self._steam.pinned(sender):
+                if sending:
+                    job.offer_id = await self._steam.send_trade_offer(
                         sender=sender,
-                        items=chosen_items,
-                        partner_steam_id64=partner_id,
-                        partner_trade_token=partner_token,
-                    )
-                    logger.info(
-                        f"{acceptor.username} | Trade offer #{offer_id} sent successfully"
-                    )
-                    await self._steam.accept_trade_offer(
-                        acceptor=acceptor,
-                        trade_offer_id=offer_id,
-                        partner_steam_id64=partner_id,
+                        items=selection.items.to_items(),
+                        partner_steam_id64=job.partner_steam_id64,
+                        partner_trade_token=job.partner_trade_token,
                     )
                     logger.info(
-                        f"{acceptor.username} | Trade offer #{offer_id} accepted successfully"
+                        f"{acceptor.username} | Trade offer #{job.offer_id} sent successfully"
                     )
-                    self._results.success(acceptor)
-                    self._planning.remove_used(
-                        priced_by_sender=self._priced_by_sender,
-                        original_by_sender=self._original_by_sender,
-                        sender_name=sender_name,
-                        selection=selection,
+                    await self._record(
+                        "offer_sent",
+                        acceptor=acceptor.username,
+                        sender=sender_name,
+                        offer_id=job.offer_id,
+                        partner_steam_id64=job.partner_steam_id64,
+                        assets=assets,
                     )
-                    self._results.update_balance(self._priced_by_sender)
-                    return
+                sending = False
+                await self._steam.accept_trade_offer(
+                    acceptor=acceptor,
+                    trade_offer_id=job.offer_id,
+                    partner_steam_id64=job.partner_steam_id64,
+                )
+        except Exception:
+            self._release(*job.reservation)
+            job.reservation = None
+            job.offer_id = None
+            job.failed_sender = sender_name if sending else None
+            raise
+
+        logger.info(f"{acceptor.username} | Trade offer #{job.offer_id} accepted successfully")
+        await self._record("offer_accepted", acceptor=acceptor.username, offer_id=job.offer_id)
+        await self._record("items_removed", sender=sender_name, assets=assets)
+        self._steam.record_removed(
+            account=sender,
+            app_id=self._config.trade_settings.app_id,
+            context_id=self._config.trade_settings.context_id,
+            assets=assets,
+        )
+        self._results.update_balance(self._priced_by_sender)
+
+    async def _finish(self, job: AcceptorJob, message: str | None = None) -> None:
+        if job.proxy is not None:
+            await self._proxies.release(job.proxy, success=True if message is None else None)
+            job.proxy = None
+        await self._steam.close_session(job.account, invalidate=True)
+
+        if message is None:
+            self._results.success(job.account)
+            self._metrics.increment("acceptors_success")
+        else:
+            self._results.error(account=job.account, message=message)
+            self._metrics.increment("acceptors_error")
+
+        self._remaining -= 1
+        if self._remaining == 0:
+            self._done.set()
+
+    async def _fail(self, job: AcceptorJob, ex: Exception) -> None:
+        sender = self._senders_by_name.get(job.failed_sender)
+        job.failed_sender = None
+        if sender is None and job.proxy is not None and self._proxies.is_proxy_fault(ex):
+            self._proxies.report(job.proxy, success=False)
+        if sender is not None and self._steam.is_session_fault(ex):
+            await self._steam.close_session(sender, invalidate=True)
 
+        if isinstance(ex, TargetNotReachable):
+            target = self._config.trade_settings.target
+            await self._finish(job=job, message=f"Not enough items to reach target ${target:.2f}")
+            return
+
+        job.attempts -= 1
+        if job.attempts <= 0:
+            await self._finish(job=job, message="Unable to process trade offer")
+            return
+
+        retry = self._config.program_settings.perform_trade_offer_attempts - job.attempts
+        delay = self._retries.backoff(ex, retry)
+        if sender is None and self._steam.is_session_fault(ex):
+            await self._steam.close_session(job.account, invalidate=True)
+        self._metrics.retry(ex.__class__.__name__)
+        logger.warning(
+            f"{job.account.username} | {ex.__class__.__name__} | "
+            f"Retrying in {delay:.0f}s ({job.attempts} attempts left)"
+        )
+        await self._proxies.release(job.proxy)
+        job.proxy = None
+        self._retries.schedule(job, delay)
+
+    def _warm_target(self) -> int:
+        ps = self._config.program_settings
+        login, trade = self._metrics.mean("login"), self._metrics.mean("trade")
+        if not login or not trade:
+            return min(ps.prefetch_acceptors, ps.warm_acceptors)
+        return max(1, min(ceil(self._worker_count() * login / trade), ps.warm_acceptors))
+
+    async def _warm_worker(self) -> None:
+        while True:
+            async with self._warm_changed:
+                await self._warm_changed.wait_for(lambda: self._warming < self._warm_target())
+                self._warming += 1
+
+            job = await self._pending.get()
+            job.proxy = await self._proxies.acquire()
+            job.account.proxy = job.proxy
+            if job.reservation is None:
+                try:
+                    await self._steam.warm_up(job.account)
                 except Exception as ex:
-                    if isinstance(ex, TargetNotReachable):
-                        self._results.error(
-                            account=acceptor,
-                            message=f"Not enough items to reach target ${ts.target:.2f}"
-                        )
-                        return
-
-                    attempts -= 1
-                    if attempts > 0:
-                        logger.warning(
-                            f"{acceptor.username} | {ex.__class__.__name__} | "
-                            f"Retrying ({attempts} attempts left)"
-                        )
-                        await asyncio.sleep(20)
-                finally:
-                    await self._proxies.put(proxy)
+                    await self._warm_taken()
+                    await self._fail(job, ex)
+                    continue
+            job.warmed_at = monotonic()
+            self._warmed.put_nowait(job)
 
-            self._results.error(acceptor)
-        finally:
-            await self._steam.close_session(acceptor)
+    async def _warm_taken(self) -> None:
+        async with self._warm_changed:
+            self._warming -= 1
+            self._warm_changed.notify_all()
+
+    async def _next_job(self) -> AcceptorJob:
+        ps = self._config.program_settings
+        if not ps.warm_acceptors:
+            job = await self._pending.get()
+            job.proxy = await self._proxies.acquire()
+            job.account.proxy = job.proxy
+            return job
+
+        job = await self._warmed.get()
+        await self._warm_taken()
+        if job.warmed_at is not None and monotonic() - job.warmed_at > ps.warm_idle_timeout:
+            logger.debug(f"{job.account.username} | Warm session idle too long, dropped")
+            await self._steam.close_session(job.account)
+        job.warmed_at = None
+        return job
+
+    async def _prefetch_worker(self) -> None:
+        while True:
+            job = await self._next_job()
+            if job.reservation is not None:
+                await self._ready.put(job)
+                continue
+
+            started = perf_counter()
+            try:
+                needs_trade = await self._evaluate(job)
+            except Exception as ex:
+                await self._fail(job, ex)
+                continue
+            self._proxies.report(job.proxy, latency=perf_counter() - started)
+
+            if needs_trade:
+                await self._ready.put(job)
+            else:
+                await self._finish(job)
+
+    async def _trade_worker(self) -> None:
+        while True:
+            job = await self._ready.get()
+            try:
+                with self._metrics.stage("trade", account=job.account.username):
+                    await self._trade(job)
+            except Exception as ex:
+                await self._fail(job, ex)
+                continue
+            await self._finish(job)
+
+    def _worker_count(self) -> int:
+        ps = self._config.program_settings
+        return max(
+            1,
+            min(
+                ps.workers,
+                len(self._proxies),
+                len(self._senders) * ps.max_offers_per_sender,
+                len(self._acceptors),
+            ),
+        )
 
     async def execute(self) -> None:
+        ps = self._config.program_settings
+        background = []
+        if ps.metrics_interval:
+            background.append(asyncio.create_task(self._metrics.report(ps.metrics_interval)))
+        if ps.keepalive_interval:
+            background.append(
+                asyncio.create_task(self._steam.keepalive(self._senders, ps.keepalive_interval))
+            )
         try:
-            await self._prepare_data()
+            state = self._journal.load() if self._journal is not None else None
+            if state is None:
+                pending = {}
+                await self._prepare_data()
+            else:
+                pending = self._restore(state)
+                await self._steamparse.close()
+
+            self._pending = asyncio.Queue()
+            self._warmed = asyncio.Queue()
+            self._warming = 0
+            self._warm_changed = asyncio.Condition()
+            self._ready = asyncio.Queue(maxsize=ps.prefetch_acceptors)
+            self._remaining = len(self._acceptors)
+            self._done = asyncio.Event()
+            jobs = [
+                AcceptorJob(account=acceptor, attempts=ps.perform_trade_offer_attempts)
+                for acceptor in self._acceptors
+            ]
+            for job in jobs:
+                if offer := pending.get(job.account.username):
+                    self._resume_offer(job, offer)
+            if self._config.trade_settings.planning_mode == "batch":
+                jobs = await self._plan_batch(jobs)
+
+            for job in jobs:
+                self._pending.put_nowait(job)
+            if self._remaining == 0:
+                self._done.set()
+
+            workers = self._worker_count()
+            logger.info(
+                f"Processing acceptors with {workers} workers | "
+                f"prefetch={ps.prefetch_acceptors} | "
+                f"warm={ps.warm_acceptors}"
+            )
+            tasks = [
+                asyncio.create_task(self._retries.run(self._pending)),
+                *(asyncio.create_task(self._warm_worker()) for _ in range(ps.warm_acceptors)),
+                *(
+                    asyncio.create_task(self._prefetch_worker())
+                    for _ in range(ps.prefetch_acceptors)
+                ),
+                *(asyncio.create_task(self._trade_worker()) for _ in range(workers)),
+            ]
+            done = asyncio.create_task(self._done.wait())
+            try:
+                finished, _ = await asyncio.wait(
+                    [done, *tasks],
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in finished:
+                    task.result()
+            finally:
+                for task in [done, *tasks]:
+                    task.cancel()
+                await asyncio.gather(done, *tasks, return_exceptions=True)
 
-            for acceptor in self._acceptors:
-                await self._process_acceptor(acceptor)
-                await asyncio.sleep(self._config.program_settings.send_trades_delay)
+            if self._journal is not None:
+                await self._journal.close(completed=True)
         finally:
+            for task in background:
+                task.cancel()
+            if self._journal is not None:
+                await self._journal.close()
             for sender in self._senders:
                 await self._steam.close_session(sender)
+            await self._steam.close()
+            logger.info(self._metrics.summary())
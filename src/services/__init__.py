@@ -1,8 +1,29 @@
+from .confirmations import ConfirmationService
 from .console import ConsoleUI
+from .governor import LoginGovernor
+from .journal import RunJournal
+from .metrics import (
+    LatencyHistogram,
+    MetricsService,
+)
+from .limiter import (
+    ConcurrencyLimiter,
+    TokenBucket,
+    RateLimiterService,
+)
 from .optimizer import OptimizerService
 from .planner import TradePlanningService
+from .proxies import (
+    ProxyHealth,
+    ProxyPool,
+)
 from .repository import DataAccessService
 from .results import ResultsService
+from .scheduler import RetryScheduler
+from .sessions import (
+    SessionCache,
+    SessionStore,
+)
 from .steam import SteamService
 from .steamparse import SteamParseService
 from .tracker import ProgressTracker
@@ -16,6 +37,19 @@ __all__ = [
     "ResultsService",
     "OptimizerService",
     "ConsoleUI",
+    "ConfirmationService",
+    "ConcurrencyLimiter",
+    "LoginGovernor",
+    "TokenBucket",
+    "RateLimiterService",
+    "ProxyHealth",
+    "ProxyPool",
+    "RetryScheduler",
+    "RunJournal",
+    "SessionCache",
+    "SessionStore",
+    "LatencyHistogram",
+    "MetricsService",
     "ProgressTracker",
     "ResultsWriter",
 ]
@@ -0,0 +1,80 @@
+import asyncio
+from collections.abc import (
+    Awaitable,
+    Callable,
+)
+
+from loguru import logger
+
+from src.steam import (
+    SteamAccount,
+    NotFoundMobileConfirmationError,
+)
+
+
+class ConfirmationService:
+    def __init__(self, poll_interval: float = 2.0, max_polls: int = 5):
+        self._poll_interval = poll_interval
+        self._max_polls = max_polls
+        self._pending: dict[str, dict[int, asyncio.Future]] = {}
+        self._polls: dict[int, int] = {}
+        self._pollers: dict[str, asyncio.Task] = {}
+        self._sessions: dict[str, Callable[[], Awaitable[SteamAccount]]] = {}
+
+    async def confirm(
+        self,
+        username: str,
+        get_session: Callable[[], Awaitable[SteamAccount]],
+        trade_offer_id: int,
+    ) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(username, {})[trade_offer_id] = future
+        self._polls[trade_offer_id] = 0
+        self._sessions[username] = get_session
+        if username not in self._pollers:
+            self._pollers[username] = asyncio.create_task(self._poll(username))
+        await future
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, ex: Exception | None = None) -> None:
+        if future.done():
+            return
+        if ex is None:
+            future.set_result(None)
+        else:
+            future.set_exception(ex)
+
+    async def _poll(self, username: str) -> None:
+        pending = self._pending[username]
+        try:
+            while pending:
+                try:
+                    session = await self._sessions[username]()
+                    confirmations = await session.get_mobile_confirmations()
+                    matched = [c for c in confirmations if c.trade_offer_id in pending]
+                    if matched:
+                        await session.mobile_confirm_many(matched)
+                except Exception as ex:
+                    for offer_id in list(pending):
+                        self._polls.pop(offer_id, None)
+                        self._resolve(pending.pop(offer_id), ex)
+                    break
+
+                if matched:
+                    logger.debug(f"{username} | {len(matched)} trade offers confirmed")
+                for confirmation in matched:
+                    self._polls.pop(confirmation.trade_offer_id, None)
+                    self._resolve(pending.pop(confirmation.trade_offer_id))
+
+                for offer_id in list(pending):
+                    self._polls[offer_id] += 1
+                    if self._polls[offer_id] >= self._max_polls:
+                        self._polls.pop(offer_id)
+                        self._resolve(pending.pop(offer_id), NotFoundMobileConfirmationError())
+
+                if pending:
+                    await asyncio.sleep(self._poll_interval)
+        finally:
+            self._pollers.pop(username, None)
+            self._pending.pop(username, None)
+            self._sessions.pop(username, None)
@@ -0,0 +1,88 @@
+import asyncio
+from contextlib import asynccontextmanager
+from itertools import count
+from time import monotonic
+
+from loguru import logger
+
+from src.steam.exceptions import AuthorizationError
+
+
+class LoginGovernor:
+    def __init__(
+        self,
+        concurrency: int = 5,
+        per_minute: float = 60.0,
+        per_minute_per_proxy: float = 6.0,
+        max_slowdown: float = 16.0,
+    ):
+        self._concurrency = concurrency
+        self._interval = 60 / per_minute
+        self._key_interval = 60 / per_minute_per_proxy
+        self._max_slowdown = max_slowdown
+        self._slowdown = 1.0
+        self._active = 0
+        self._next_global = 0.0
+        self._next_by_key: dict[str, float] = {}
+        self._waiters: dict[int, tuple[int, str]] = {}
+        self._sequence = count()
+        self._changed = asyncio.Condition()
+
+    @property
+    def slowdown(self) -> float:
+        return self._slowdown
+
+    def _wait_time(self, ticket: int, now: float) -> float | None:
+        if self._active >= self._concurrency:
+            return None
+        if self._next_global > now:
+            return self._next_global - now
+
+        _, key = self._waiters[ticket]
+        for other in sorted(self._waiters, key=lambda t: (self._waiters[t][0], t)):
+            other_key = self._waiters[other][1]
+            ready_at = self._next_by_key.get(other_key, 0.0)
+            if ready_at <= now:
+                return 0.0 if other == ticket else None
+            if other == ticket:
+                return ready_at - now
+        return None
+
+    async def _acquire(self, key: str, priority: int):
+        ticket = next(self._sequence)
+        async with self._changed:
+            self._waiters[ticket] = (priority, key)
+            try:
+                while (wait := self._wait_time(ticket, monotonic())) != 0.0:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                del self._waiters[ticket]
+                self._changed.notify_all()
+
+            now = monotonic()
+            self._active += 1
+            self._next_global = now + self._interval * self._slowdown
+            self._next_by_key[key] = now + self._key_interval * self._slowdown
+
+    async def _release(self, ex: BaseException | None):
+        async with self._changed:
+            self._active -= 1
+            if isinstance(ex, AuthorizationError):
+                self._slowdown = min(self._slowdown * 2, self._max_slowdown)
+                logger.warning(f"Login rate lowered | slowdown x{self._slowdown:.1f}")
+            elif ex is None:
+                self._slowdown = max(self._slowdown * 0.9, 1.0)
+            self._changed.notify_all()
+
+    @asynccontextmanager
+    async def admit(self, key: str = "", priority: int = 1):
+        await self._acquire(key, priority)
+        try:
+            yield
+        except BaseException as ex:
+            await self._release(ex)
+            raise
+        await self._release(None)
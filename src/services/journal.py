@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from time import time
+
+from loguru import logger
+from pydantic import ValidationError
+
+from src.models import (
+    JournalOffer,
+    JournalState,
+)
+
+
+class RunJournal:
+    def __init__(
+        self,
+        path: Path = Path("data/journal.jsonl"),
+        batch_size: int = 64,
+        batch_delay: float = 0.05,
+        max_age: float = 21600,
+    ):
+        self._path = path
+        self._max_age = max_age
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+        self._buffer: list[str] = []
+        self._waiters: list[asyncio.Future] = []
+        self._flush_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._file = None
+
+    def load(self) -> JournalState | None:
+        if not self._path.exists():
+            return None
+
+        state, outdated = None, False
+        with self._path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Journal ends with a partial record, ignoring it")
+                    break
+
+                event = record.pop("event")
+                if event == "prepared":
+                    try:
+                        state = JournalState.model_validate(record)
+                    except ValidationError:
+                        state, outdated = None, True
+                        break
+                elif state is None:
+                    continue
+                elif event == "offer_sent":
+                    state.pending[record["acceptor"]] = JournalOffer.model_validate(record)
+                elif event == "offer_accepted":
+                    state.pending.pop(record["acceptor"], None)
+                elif event == "items_removed":
+                    state.removed.setdefault(record["sender"], set()).update(
+                        tuple(asset) for asset in record["assets"]
+                    )
+
+        if outdated:
+            invalid = self._path.with_suffix(".invalid")
+            self._path.replace(invalid)
+            logger.warning(f"Journal has an outdated format, moved to {invalid}")
+            return None
+        if state is not None and (age := time() - state.prepared_at) > self._max_age:
+            expired = self._path.with_suffix(".expired")
+            self._path.replace(expired)
+            logger.warning(
+                f"Journal expired ({age / 3600:.1f}h old), moved to {expired} | "
+                f"{len(state.pending)} offers were pending"
+            )
+            return None
+        return state
+
+    def _write(self, lines: list[str]) -> None:
+        if self._file is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self._path.open("a", encoding="utf-8")
+        self._file.write("".join(f"{line}\n" for line in lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def flush(self) -> None:
+        async with self._lock:
+            lines, waiters = self._buffer, self._waiters
+            self._buffer, self._waiters = [], []
+            try:
+                if lines:
+                    await asyncio.to_thread(self._write, lines)
+            except Exception as ex:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(ex)
+                raise
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._batch_delay)
+        self._flush_task = None
+        await self.flush()
+
+    async def record(self, event: str, **data) -> None:
+        self._buffer.append(json.dumps({"event": event, **data}))
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        if len(self._buffer) >= self._batch_size:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+        await waiter
+
+    async def close(self, completed: bool = False) -> None:
+        await self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if completed:
+            self._path.unlink(missing_ok=True)
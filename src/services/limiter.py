@@ -0,0 +1,58 @@
+import asyncio
+from contextlib import asynccontextmanager
+from time import monotonic
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, refill_interval: float):
+        self._capacity = capacity
+        self._refill_interval = refill_interval
+        self._tokens = float(capacity)
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(
+            self._capacity,
+            self._tokens + (now - self._updated) / self._refill_interval,
+        )
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * self._refill_interval)
+                self._refill()
+            self._tokens -= 1
+
+
+class RateLimiterService:
+    def __init__(self, burst: int, refill_interval: float):
+        self._burst = burst
+        self._refill_interval = refill_interval
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def _bucket(self, key: str) -> TokenBucket:
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(self._burst, self._refill_interval)
+        return self._buckets[key]
+
+    async def acquire(self, key: str):
+        await self._bucket(key).acquire()
+
+
+class ConcurrencyLimiter:
+    def __init__(self, limit: int, per_key_limit: int):
+        self._global = asyncio.Semaphore(limit)
+        self._per_key_limit = per_key_limit
+        self._keys: dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, key: str):
+        if key not in self._keys:
+            self._keys[key] = asyncio.Semaphore(self._per_key_limit)
+        async with self._keys[key]:
+            async with self._global:
+                yield
@@ -0,0 +1,157 @@
+import asyncio
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from time import (
+    monotonic,
+    perf_counter,
+)
+
+from loguru import logger
+
+
+class LatencyHistogram:
+    BOUNDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.buckets[bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class MetricsService:
+    def __init__(self):
+        self._started = monotonic()
+        self._stages: dict[str, LatencyHistogram] = {}
+        self._accounts: dict[tuple[str, str], LatencyHistogram] = {}
+        self._proxies: dict[tuple[str, str], LatencyHistogram] = {}
+        self._errors: Counter[tuple[str, str]] = Counter()
+        self._retries: Counter[str] = Counter()
+        self._counters: Counter[str] = Counter()
+
+    @staticmethod
+    def _histogram(histograms: dict, key) -> LatencyHistogram:
+        if key not in histograms:
+            histograms[key] = LatencyHistogram()
+        return histograms[key]
+
+    def observe(
+        self,
+        name: str,
+        seconds: float,
+        account: str | None = None,
+        proxy: str | None = None,
+        error: Exception | None = None,
+    ):
+        if error is not None:
+            self._errors[(name, error.__class__.__name__)] += 1
+        self._histogram(self._stages, name).observe(seconds)
+        if account:
+            self._histogram(self._accounts, (name, account)).observe(seconds)
+        if proxy:
+            self._histogram(self._proxies, (name, proxy)).observe(seconds)
+
+    @contextmanager
+    def stage(self, name: str, account: str | None = None, proxy: str | None = None):
+        started = perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as ex:
+            error = ex
+            raise
+        finally:
+            self.observe(name, perf_counter() - started, account, proxy, error)
+
+    def mean(self, stage: str) -> float:
+        hist = self._stages.get(stage)
+        return hist.mean if hist else 0.0
+
+    def retry(self, reason: str):
+        self._retries[reason] += 1
+
+    def increment(self, name: str, value: int = 1):
+        self._counters[name] += value
+
+    def snapshot(self) -> str:
+        minutes = max(monotonic() - self._started, 1e-9) / 60
+        done = self._counters["acceptors_success"] + self._counters["acceptors_error"]
+        stages = " | ".join(
+            f"{name}={hist.count}x{hist.mean:.2f}s"
+            for name, hist in self._stages.items()
+        )
+        return f"{done} acceptors ({done / minutes:.1f}/min) | {stages}"
+
+    def summary(self) -> str:
+        lines = [f"Run metrics | {self.snapshot()}"]
+        lines.append(
+            f"{'stage':<20}{'count':>8}{'errors':>8}"
+            f"{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}"
+        )
+        for name, hist in self._stages.items():
+            errors = sum(c for (stage, _), c in self._errors.items() if stage == name)
+            lines.append(
+                f"{name:<20}{hist.count:>8}{errors:>8}{hist.mean:>9.2f}"
+                f"{hist.quantile(0.5):>9.2f}{hist.quantile(0.95):>9.2f}{hist.max:>9.2f}"
+            )
+
+        for title, histograms in (("accounts", self._accounts), ("proxies", self._proxies)):
+            totals: dict[str, LatencyHistogram] = {}
+            for (_, key), hist in histograms.items():
+                total = self._histogram(totals, key)
+                total.count += hist.count
+                total.total += hist.total
+                total.max = max(total.max, hist.max)
+            slowest = sorted(totals.items(), key=lambda x: x[1].mean, reverse=True)[:5]
+            if slowest:
+                lines.append(
+                    f"slowest {title}: "
+                    + ", ".join(f"{key}={hist.mean:.2f}s" for key, hist in slowest)
+                )
+
+        if self._errors:
+            lines.append(
+                "errors: "
+                + ", ".join(
+                    f"{stage}/{name}={c}" for (stage, name), c in self._errors.most_common()
+                )
+            )
+        counters = {
+            name: value for name, value in self._counters.items()
+            if not name.startswith("acceptors_")
+        }
+        if counters:
+            lines.append(
+                "counters: " + ", ".join(f"{name}={value}" for name, value in counters.items())
+            )
+        if self._retries:
+            lines.append(
+                "retries: "
+                + ", ".join(f"{name}={c}" for name, c in self._retries.most_common())
+            )
+        return "\n".join(lines)
+
+    async def report(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            logger.info(f"Metrics | {self.snapshot()}")
@@ -1,15 +1,22 @@
+from bisect import (
+    bisect_left,
+    bisect_right,
+    insort,
+)
 from decimal import (
     Decimal,
     ROUND_HALF_UP,
 )
 
 from src.models import (
-    PricedItem,
+    PricedInventory,
     Selection,
 )
 
 
 class OptimizerService:
+    BATCH_SENDER_TRIES = 3
+
     def __init__(self, overfill: float = 0.50):
         self._overfill = overfill
 
@@ -18,16 +25,11 @@ class OptimizerService:
         dec = Decimal(str(value))
         return max(0, int((dec * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP)))
 
-    @staticmethod
-    def _sum_cents(items: list[PricedItem]) -> int:
-        return sum(OptimizerService._to_cents(it.net_price) for it in items)
-
     @staticmethod
     def _reconstruct(
         parents: list[tuple[int, int] | None],
         best: int,
-        items: list[PricedItem],
-    ) -> list[PricedItem]:
+    ) -> list[int]:
         indices = []
         curr = best
         while curr and parents[curr]:
@@ -35,17 +37,17 @@ class OptimizerService:
             indices.append(idx)
             curr = prev
         indices.reverse()
-        return [items[i] for i in indices]
+        return indices
 
     def find_optimal_subset(
         self,
-        items: list[PricedItem],
+        items: PricedInventory,
         target: float,
     ) -> Selection | None:
         if not items:
             return None
 
-        prices = [self._to_cents(it.net_price) for it in items]
+        prices = items.cents
         target_cents = self._to_cents(target)
 
         over_cents = self._to_cents(self._overfill)
@@ -77,18 +79,18 @@ class OptimizerService:
         if best is None:
             return None
 
-        selected = self._reconstruct(parents, best, items)
-        total = self._sum_cents(selected) / 100.0
+        selected = self._reconstruct(parents, best)
+        total = sum(prices[i] for i in selected) / 100.0
 
         return Selection(
             total=total,
-            items=selected,
+            items=items.take(selected),
             item_count=len(selected),
         )
 
     def find_best_sender(
         self,
-        sender_items: dict[str, list[PricedItem]],
+        sender_items: dict[str, PricedInventory],
         target: float,
     ) -> tuple[str, Selection] | None:
         candidates = [
@@ -105,3 +107,91 @@ class OptimizerService:
             return -over * 1e6 - selection.item_count * 1e3 - selection.total
         
         return max(candidates, key=lambda x: score(x[1]))
+
+    @staticmethod
+    def _fill(
+        prices: list[int],
+        target_cents: int,
+        over_cents: int,
+    ) -> list[int] | None:
+        capacity = target_cents + over_cents
+        mask = (1 << (capacity + 1)) - 1
+        reach = 1
+        layers = []
+        # Largest prices first, so the walk back below keeps big items and stays short.
+        for idx in range(bisect_right(prices, capacity) - 1, -1, -1):
+            layers.append((idx, reach))
+            reach = (reach | (reach << prices[idx])) & mask
+            if (reach >> target_cents) & 1:
+                break
+
+        high = reach >> target_cents
+        if not high:
+            return None
+
+        total = target_cents + (high & -high).bit_length() - 1
+        chosen = []
+        for idx, before in reversed(layers):
+            if not (before >> total) & 1:
+                chosen.append(idx)
+                total -= prices[idx]
+        return chosen
+
+    def find_batch_assignment(
+        self,
+        sender_items: dict[str, PricedInventory],
+        targets: dict[str, float],
+    ) -> dict[str, tuple[str, Selection]]:
+        over_cents = self._to_cents(self._overfill)
+        limit = self._to_cents(max(targets.values(), default=0.0)) + over_cents
+        prices, rows = {}, {}
+        for sender, items in sender_items.items():
+            pool = sorted(
+                (cents, row) for row, cents in enumerate(items.cents) if 0 < cents <= limit
+            )
+            prices[sender] = [cents for cents, _ in pool]
+            rows[sender] = [row for _, row in pool]
+        ranked = sorted((sum(pool), sender) for sender, pool in prices.items())
+
+        assignment = {}
+        for name, target in sorted(targets.items(), key=lambda x: x[1]):
+            target_cents = self._to_cents(target)
+            start = bisect_left(ranked, (target_cents, ""))
+            tries = self.BATCH_SENDER_TRIES
+            candidates = (
+                ranked[start:start + tries]
+                + ranked[max(start + tries, len(ranked) - tries):]
+            )
+            best = None
+            for capacity, sender in candidates:
+                chosen = self._fill(
+                    prices=prices[sender],
+                    target_cents=target_cents,
+                    over_cents=over_cents,
+                )
+                if chosen is None:
+                    continue
+                score = (sum(prices[sender][idx] for idx in chosen), len(chosen))
+                if best is None or score < best[0]:
+                    best = (score, capacity, sender, chosen)
+            if best is None:
+                continue
+
+            (total_cents, _), capacity, sender, chosen = best
+            selected = sender_items[sender].take(rows[sender][idx] for idx in chosen)
+            for idx in sorted(chosen, reverse=True):
+                del prices[sender][idx]
+                del rows[sender][idx]
+
+            ranked.remove((capacity, sender))
+            insort(ranked, (capacity - total_cents, sender))
+            assignment[name] = (
+                sender,
+                Selection(
+                    total=total_cents / 100.0,
+                    items=selected,
+                    item_count=len(selected),
+                ),
+            )
+
+        return assignment
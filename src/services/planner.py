@@ -1,17 +1,19 @@
+from collections.abc import AsyncIterable
 from decimal import (
     Decimal,
     ROUND_HALF_UP,
 )
+from functools import lru_cache
 
 from loguru import logger
 
 from src.exceptions import TargetNotReachable
 from src.models import (
-    PricedItem,
+    PricedInventory,
     Selection,
 )
 from src.services.optimizer import OptimizerService
-from src.steam import Item
+from src.steam import Inventory
 
 
 class TradePlanningService:
@@ -24,49 +26,83 @@ class TradePlanningService:
         return max(0, int((dec * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP)))
 
     @staticmethod
-    def _filter_items(
-        items: list[Item],
+    @lru_cache(maxsize=65536)
+    def _net_cents(price: float) -> int:
+        return TradePlanningService._to_cents(PricedInventory.net_price(price))
+
+    @staticmethod
+    def _allowed_names(
+        items: Inventory,
         whitelist: list[str] | None,
         blacklist: list[str] | None,
-    ) -> list[Item]:
-        if whitelist:
-            items = [
-                item for item in items
-                if any(w.lower() in item.market_hash_name.lower() for w in whitelist)
-            ]
-        if blacklist:
-            items = [
-                item for item in items
-                if not any(b.lower() in item.market_hash_name.lower() for b in blacklist)
-            ]
-        return items
-
-    def build_price_index(
+    ) -> list[bool]:
+        whitelist = [w.lower() for w in whitelist or []]
+        blacklist = [b.lower() for b in blacklist or []]
+        allowed = []
+        for _, market_hash_name in items.names:
+            name = market_hash_name.lower()
+            allowed.append(
+                (not whitelist or any(w in name for w in whitelist))
+                and not any(b in name for b in blacklist)
+            )
+        return allowed
+
+    def price_inventory(
         self,
-        inventories: list[tuple[str, list[Item]]],
+        items: Inventory,
         price_dict: dict[str, float],
         items_whitelist: list[str] | None = None,
         items_blacklist: list[str] | None = None,
-    ) -> tuple[dict[str, list[PricedItem]], dict[str, dict[tuple[int, int], Item]]]:
-        priced_by_sender = {}
-        original_by_sender = {}
-
-        for username, items in inventories:
-            items = self._filter_items(items, items_whitelist, items_blacklist)
-            original_by_sender[username] = {(it.asset_id, it.class_id): it for it in items}
-
-            priced = [
-                PricedItem.from_item(item, price)
-                for item in items
-                if (price := price_dict.get(item.market_hash_name, 0)) > 0
-            ]
-            priced.sort(key=lambda x: x.price, reverse=True)
-            priced_by_sender[username] = priced
-
-        return priced_by_sender, original_by_sender
-
-    def estimate_value(self, items: list[PricedItem]) -> float:
-        return sum(self._to_cents(it.net_price) for it in items) / 100.0
+    ) -> PricedInventory:
+        allowed = self._allowed_names(items, items_whitelist, items_blacklist)
+        prices = [
+            price_dict.get(market_hash_name, 0) if ok else 0
+            for (_, market_hash_name), ok in zip(items.names, allowed)
+        ]
+        cents = [self._net_cents(price) if price > 0 else 0 for price in prices]
+
+        rows = [row for row, name_id in enumerate(items.name_ids) if prices[name_id] > 0]
+        rows.sort(key=lambda row: prices[items.name_ids[row]], reverse=True)
+        return PricedInventory(
+            inventory=items,
+            rows=rows,
+            prices=(prices[items.name_ids[row]] for row in rows),
+            cents=(cents[items.name_ids[row]] for row in rows),
+        )
+
+    async def build_price_index(
+        self,
+        inventories: AsyncIterable[tuple[str, Inventory]],
+        price_dict: dict[str, float],
+        items_whitelist: list[str] | None = None,
+        items_blacklist: list[str] | None = None,
+        index: dict[str, PricedInventory] | None = None,
+    ) -> dict[str, PricedInventory]:
+        """Price inventory pages as they arrive; only priced rows are kept per sender.
+
+        A sender's sorted view is published to ``index`` once its pages are exhausted.
+        """
+        index = {} if index is None else index
+        building: dict[str, PricedInventory] = {}
+        async for username, page in inventories:
+            priced = self.price_inventory(
+                items=page,
+                price_dict=price_dict,
+                items_whitelist=items_whitelist,
+                items_blacklist=items_blacklist,
+            )
+            if (current := building.get(username)) is None:
+                current = building[username] = PricedInventory(
+                    Inventory(app_id=page.app_id, context_id=page.context_id)
+                )
+            current.extend(priced)
+
+        for username, current in building.items():
+            index[username] = current.sort()
+        return index
+
+    def estimate_value(self, items: PricedInventory) -> float:
+        return sum(items.cents) / 100.0
 
     def wallet_to_usd(
         self,
@@ -88,7 +124,7 @@ class TradePlanningService:
 
     def select_best_sender(
         self,
-        priced_by_sender: dict[str, list[PricedItem]],
+        priced_by_sender: dict[str, PricedInventory],
         target: float,
     ) -> tuple[str, Selection]:
         result = self._optimizer.find_best_sender(priced_by_sender, target)
@@ -96,30 +132,30 @@ class TradePlanningService:
             raise TargetNotReachable()
         return result
 
-    @staticmethod
-    def to_original(
-        selection: Selection,
-        original_index: dict[tuple[int, int], Item],
-    ) -> list[Item]:
-        return [
-            original_index[(pi.asset_id, pi.class_id)]
-            for pi in selection.items
-            if (pi.asset_id, pi.class_id) in original_index
-        ]
+    def plan_batch(
+        self,
+        priced_by_sender: dict[str, PricedInventory],
+        deficits: dict[str, float],
+    ) -> dict[str, tuple[str, Selection]]:
+        plan = self._optimizer.find_batch_assignment(priced_by_sender, deficits)
+        logger.debug(f"Batch plan covers {len(plan)}/{len(deficits)} accounts")
+        return plan
 
     @staticmethod
     def remove_used(
-        priced_by_sender: dict[str, list[PricedItem]],
-        original_by_sender: dict[str, dict[tuple[int, int], Item]],
+        priced_by_sender: dict[str, PricedInventory],
         sender_name: str,
         selection: Selection,
     ) -> None:
-        used = {(it.asset_id, it.class_id) for it in selection.items}
-        priced_by_sender[sender_name] = [
-            it for it in priced_by_sender[sender_name] if (it.asset_id, it.class_id) not in used
-        ]
-        for key in used:
-            original_by_sender[sender_name].pop(key, None)
-
+        used = set(selection.items.assets())
+        priced_by_sender[sender_name] = priced_by_sender[sender_name].without(used)
         logger.debug(f"{sender_name} | {len(priced_by_sender[sender_name])} items remaining")
 
+    @staticmethod
+    def restore_used(
+        priced_by_sender: dict[str, PricedInventory],
+        sender_name: str,
+        selection: Selection,
+    ) -> None:
+        priced_by_sender[sender_name] = priced_by_sender[sender_name].merge(selection.items)
+        logger.debug(f"{sender_name} | {len(priced_by_sender[sender_name])} items remaining")
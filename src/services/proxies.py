@@ -0,0 +1,123 @@
+import asyncio
+from time import monotonic
+
+from httpx import (
+    HTTPStatusError,
+    TransportError,
+)
+from loguru import logger
+
+from src.models import Proxy
+
+
+class ProxyHealth:
+    def __init__(self):
+        self.latency: float | None = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.quarantined_until = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    def score(self, default_latency: float) -> float:
+        latency = self.latency if self.latency is not None else default_latency
+        return self.success_rate / (latency + 0.1)
+
+
+class ProxyPool:
+    def __init__(
+        self,
+        proxies: list[Proxy],
+        quarantine_after: int = 2,
+        base_cooldown: float = 30.0,
+        max_cooldown: float = 600.0,
+        smoothing: float = 0.3,
+    ):
+        self._proxies = list({p.to_format(): p for p in proxies}.values())
+        self._health = {p.to_format(): ProxyHealth() for p in self._proxies}
+        self._idle: dict[str, Proxy] = {p.to_format(): p for p in self._proxies}
+        self._quarantine_after = quarantine_after
+        self._base_cooldown = base_cooldown
+        self._max_cooldown = max_cooldown
+        self._smoothing = smoothing
+        self._changed = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return len(self._proxies)
+
+    def qsize(self) -> int:
+        return len(self._idle)
+
+    @staticmethod
+    def is_proxy_fault(ex: Exception) -> bool:
+        if isinstance(ex, TransportError):
+            return True
+        if isinstance(ex, HTTPStatusError):
+            return ex.response.status_code in (407, 429)
+        return False
+
+    def _default_latency(self) -> float:
+        known = [h.latency for h in self._health.values() if h.latency is not None]
+        return sum(known) / len(known) if known else 1.0
+
+    def _pick(self) -> Proxy | float:
+        now = monotonic()
+        available = [
+            p for key, p in self._idle.items()
+            if self._health[key].quarantined_until <= now
+        ]
+        if not available:
+            expiries = [self._health[key].quarantined_until for key in self._idle]
+            return min(expiries) - now if expiries else 0.0
+
+        default_latency = self._default_latency()
+        best = max(available, key=lambda p: self._health[p.to_format()].score(default_latency))
+        del self._idle[best.to_format()]
+        return best
+
+    async def acquire(self) -> Proxy:
+        async with self._changed:
+            while True:
+                picked = self._pick()
+                if isinstance(picked, Proxy):
+                    return picked
+                try:
+                    await asyncio.wait_for(self._changed.wait(), picked or None)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _report(self, proxy: Proxy, success: bool | None, latency: float | None):
+        health = self._health[proxy.to_format()]
+        if latency is not None:
+            health.latency = (
+                latency if health.latency is None
+                else self._smoothing * latency + (1 - self._smoothing) * health.latency
+            )
+        if success is True:
+            health.successes += 1
+            health.consecutive_failures = 0
+        elif success is False:
+            health.failures += 1
+            health.consecutive_failures += 1
+            overflow = health.consecutive_failures - self._quarantine_after
+            if overflow >= 0:
+                cooldown = min(self._base_cooldown * 2 ** overflow, self._max_cooldown)
+                health.quarantined_until = monotonic() + cooldown
+                logger.warning(f"Proxy {proxy.address} quarantined for {cooldown:.0f}s")
+
+    async def release(
+        self,
+        proxy: Proxy,
+        success: bool | None = None,
+        latency: float | None = None,
+    ):
+        self._report(proxy, success, latency)
+        async with self._changed:
+            self._idle[proxy.to_format()] = proxy
+            self._changed.notify()
+
+    def report(self, proxy: Proxy, success: bool | None = None, latency: float | None = None):
+        self._report(proxy, success, latency)
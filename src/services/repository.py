@@ -1,4 +1,3 @@
-import asyncio
 import random
 from pathlib import Path
 
@@ -9,6 +8,7 @@ from src.models import (
     Account,
     Proxy,
 )
+from src.services.proxies import ProxyPool
 
 
 class DataAccessService:
@@ -75,20 +75,20 @@ class DataAccessService:
             pass
     
     @staticmethod
-    def get_proxies() -> asyncio.Queue[Proxy]:
+    def get_proxies() -> ProxyPool:
         logger.debug("Loading proxy servers from proxies.txt")
         lines = DataAccessService._read_lines("proxies.txt")
         random.shuffle(lines)
         
-        proxies = asyncio.Queue()
+        proxies = []
         for line in lines:
             try:
-                proxies.put_nowait(Proxy.from_string(line))
+                proxies.append(Proxy.from_string(line))
             except ValueError:
                 raise DatabaseError(
                     f"Invalid proxy format: {line}\n"
                     f"Expected: Host:Port:Username:Password"
                 )
         
-        logger.debug(f"Loaded {proxies.qsize()} proxies")
-        return proxies
+        logger.debug(f"Loaded {len(proxies)} proxies")
+        return ProxyPool(proxies)
@@ -1,6 +1,6 @@
 from src.models import (
     Account,
-    PricedItem,
+    PricedInventory,
 )
 
 from src.services.console import ConsoleUI
@@ -23,10 +23,7 @@ class ResultsService:
         self._writer.write_error(account, message)
         ConsoleUI.update_title(self._tracker.get_stats())
     
-    def update_balance(self, priced_by_sender: dict[str, list[PricedItem]]):
-        total = sum(
-            sum(item.net_price for item in items)
-            for items in priced_by_sender.values()
-        )
+    def update_balance(self, priced_by_sender: dict[str, PricedInventory]):
+        total = sum(items.net_total for items in priced_by_sender.values())
         self._tracker.set_balance(total)
         ConsoleUI.update_title(self._tracker.get_stats())
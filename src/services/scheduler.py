@@ -0,0 +1,72 @@
+import asyncio
+import heapq
+import random
+from itertools import count
+from time import monotonic
+
+from httpx import (
+    HTTPStatusError,
+    TransportError,
+)
+
+from src.steam.exceptions import (
+    AuthorizationError,
+    InventoryError,
+    MobileConfirmationError,
+    SteamServerDownError,
+    TradeOffersLimitError,
+)
+
+
+class RetryScheduler:
+    DELAYS: dict[type[Exception], float] = {
+        TransportError: 5.0,
+        InventoryError: 10.0,
+        MobileConfirmationError: 10.0,
+        AuthorizationError: 30.0,
+        HTTPStatusError: 30.0,
+        SteamServerDownError: 60.0,
+        TradeOffersLimitError: 60.0,
+    }
+
+    def __init__(
+        self,
+        default_delay: float = 20.0,
+        max_delay: float = 300.0,
+        delays: dict[type[Exception], float] | None = None,
+    ):
+        self._default_delay = default_delay
+        self._max_delay = max_delay
+        self._delays = delays if delays is not None else self.DELAYS
+        self._heap: list[tuple[float, int, object]] = []
+        self._sequence = count()
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def backoff(self, ex: Exception, retry: int) -> float:
+        base = next(
+            (self._delays[cls] for cls in type(ex).__mro__ if cls in self._delays),
+            self._default_delay,
+        )
+        delay = min(base * 2 ** max(retry - 1, 0), self._max_delay)
+        return delay * random.uniform(0.8, 1.2)
+
+    def schedule(self, item, delay: float):
+        heapq.heappush(self._heap, (monotonic() + delay, next(self._sequence), item))
+        self._changed.set()
+
+    async def run(self, queue: asyncio.Queue):
+        while True:
+            now = monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, item = heapq.heappop(self._heap)
+                queue.put_nowait(item)
+
+            self._changed.clear()
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
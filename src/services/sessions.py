@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+from collections import (
+    Counter,
+    OrderedDict,
+)
+from contextlib import asynccontextmanager
+from pathlib import Path
+from time import monotonic
+
+from cryptography.fernet import (
+    Fernet,
+    InvalidToken,
+)
+from loguru import logger
+
+from src.services.metrics import MetricsService
+from src.steam import (
+    SessionData,
+    SteamAccount,
+)
+
+
+class SessionStore:
+    """Encrypted session log: changes are appended in batches and compacted on close."""
+
+    KEY_ENV = "SESSION_STORE_KEY"
+    COMPACT_AFTER = 256
+
+    def __init__(
+        self,
+        path: Path = Path("data/sessions.bin"),
+        key_path: Path = Path("data/session.key"),
+        flush_delay: float = 1.0,
+    ):
+        self._path = path
+        self._fernet = Fernet(self._load_key(key_path))
+        self._flush_delay = flush_delay
+        self._changes: dict[str, SessionData | None] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._batches = 0
+        self._lock = asyncio.Lock()
+        self._sessions = self._load()
+
+    def _load_key(self, key_path: Path) -> bytes:
+        if key := os.environ.get(self.KEY_ENV):
+            return key.encode()
+        if key_path.exists():
+            return key_path.read_bytes().strip()
+
+        key = Fernet.generate_key()
+        key_path.parent.mkdir(parents=True, exist_ok=True)
+        key_path.write_bytes(key)
+        key_path.chmod(0o600)
+        logger.debug(f"Session store key created at {key_path}")
+        return key
+
+    def _load(self) -> dict[str, SessionData]:
+        if not self._path.exists():
+            return {}
+        sessions = {}
+        for line in self._path.read_bytes().splitlines():
+            try:
+                data = json.loads(self._fernet.decrypt(line))
+            except (InvalidToken, ValueError):
+                logger.warning("Stored sessions cannot be decrypted and will be ignored")
+                continue
+            for username, session in data.items():
+                if session is None:
+                    sessions.pop(username, None)
+                else:
+                    sessions[username] = SessionData.model_validate(session)
+        return sessions
+
+    def _encrypt(self, sessions: dict[str, SessionData | None]) -> bytes:
+        data = {u: s.model_dump() if s else None for u, s in sessions.items()}
+        return self._fernet.encrypt(json.dumps(data).encode()) + b"\n"
+
+    def _append(self, changes: dict[str, SessionData | None]):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open("ab") as f:
+            f.write(self._encrypt(changes))
+
+    def _compact(self, sessions: dict[str, SessionData]):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(".tmp")
+        tmp.write_bytes(self._encrypt(sessions))
+        tmp.replace(self._path)
+
+    def _changed(self, username: str, session: SessionData | None):
+        self._changes[username] = session
+        if self._flush_task is None:
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                self._append(self._take_changes())
+
+    def _take_changes(self) -> dict[str, SessionData | None]:
+        changes, self._changes = self._changes, {}
+        return changes
+
+    async def _flush_later(self):
+        await asyncio.sleep(self._flush_delay)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not (changes := self._take_changes()):
+                return
+            self._batches += 1
+            if self._batches >= self.COMPACT_AFTER:
+                self._batches = 0
+                await asyncio.to_thread(self._compact, dict(self._sessions))
+            else:
+                await asyncio.to_thread(self._append, changes)
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        async with self._lock:
+            self._changes.clear()
+            self._batches = 0
+            await asyncio.to_thread(self._compact, dict(self._sessions))
+
+    def get(self, username: str) -> SessionData | None:
+        return self._sessions.get(username)
+
+    def set(self, username: str, session: SessionData):
+        self._sessions[username] = session
+        self._changed(username, session)
+
+    def delete(self, username: str):
+        if self._sessions.pop(username, None) is not None:
+            self._changed(username, None)
+
+
+class SessionCache:
+    def __init__(
+        self,
+        max_sessions: int = 500,
+        max_idle: float = 900.0,
+        metrics: MetricsService | None = None,
+    ):
+        self._max_sessions = max_sessions
+        self._max_idle = max_idle
+        self._metrics = metrics or MetricsService()
+        self._sessions: OrderedDict[str, tuple[SteamAccount, float]] = OrderedDict()
+        self._pins: Counter[str] = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, username: str) -> SteamAccount | None:
+        if username not in self._sessions:
+            self.misses += 1
+            self._metrics.increment("session_cache_misses")
+            return None
+        self.hits += 1
+        self._metrics.increment("session_cache_hits")
+        session, _ = self._sessions[username]
+        self._sessions[username] = (session, monotonic())
+        self._sessions.move_to_end(username)
+        return session
+
+    def peek(self, username: str) -> SteamAccount | None:
+        entry = self._sessions.get(username)
+        return entry[0] if entry else None
+
+    def pop(self, username: str) -> SteamAccount | None:
+        entry = self._sessions.pop(username, None)
+        return entry[0] if entry else None
+
+    async def put(self, username: str, session: SteamAccount):
+        previous = self._sessions.get(username)
+        if previous is not None and previous[0] is not session:
+            await previous[0].close()
+        self._sessions[username] = (session, monotonic())
+        self._sessions.move_to_end(username)
+        await self.evict()
+
+    @asynccontextmanager
+    async def pinned(self, username: str):
+        self._pins[username] += 1
+        try:
+            yield
+        finally:
+            self._pins[username] -= 1
+            if self._pins[username] <= 0:
+                del self._pins[username]
+
+    async def evict(self):
+        expired = monotonic() - self._max_idle
+        overflow = len(self._sessions) - self._max_sessions
+        victims = []
+        for username, (_, last_used) in self._sessions.items():
+            if overflow <= 0 and last_used > expired:
+                break
+            if username in self._pins:
+                continue
+            victims.append(username)
+            overflow -= 1
+
+        for username in victims:
+            session, _ = self._sessions.pop(username)
+            self.evictions += 1
+            self._metrics.increment("session_cache_evictions")
+            logger.debug(f"{username} | Session evicted")
+            await session.close()
+
+    async def clear(self):
+        sessions, self._sessions = self._sessions, OrderedDict()
+        for session, _ in sessions.values():
+            await session.close()
@@ -1,63 +1,338 @@
+import asyncio
+from collections.abc import AsyncIterator
 from pathlib import Path
+from time import (
+    perf_counter,
+    time,
+)
+from weakref import WeakValueDictionary
 
+from httpx import (
+    AsyncBaseTransport,
+    HTTPStatusError,
+)
 from loguru import logger
 
 from src.models import (
     Account,
+    SenderInventoryCache,
     TradeCredentialsCache,
 )
+from src.services.confirmations import ConfirmationService
+from src.services.governor import LoginGovernor
+from src.services.limiter import RateLimiterService
+from src.services.metrics import MetricsService
+from src.services.sessions import (
+    SessionCache,
+    SessionStore,
+)
 from src.steam import (
+    ClientFactory,
+    Inventory,
     Item,
     SteamAccount,
+    SteamClock,
+)
+from src.steam.exceptions import (
+    AuthorizationError,
+    InvalidConfirmationPageError,
 )
 
 
 class SteamService:
-    def __init__(self):
-        self._sessions: dict[str, SteamAccount] = {}
+    TOKEN_REFRESH_MARGIN = 1800
+    LOGIN_ATTEMPTS = 2
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiterService | None = None,
+        confirmations: ConfirmationService | None = None,
+        transport: AsyncBaseTransport | None = None,
+        metrics: MetricsService | None = None,
+        session_store: SessionStore | None = None,
+        login_governor: LoginGovernor | None = None,
+        http2: bool = False,
+        session_cache: SessionCache | None = None,
+        inventory_backend: str = "paginated",
+        inventory_cache: SenderInventoryCache | None = None,
+        inventory_cache_ttl: float = 3600,
+    ):
+        self._rate_limiter = rate_limiter
+        self._clients = ClientFactory(transport=transport, http2=http2)
+        self._confirmations = confirmations or ConfirmationService()
+        self._metrics = metrics or MetricsService()
+        self._store = session_store
+        self._governor = login_governor or LoginGovernor()
+        self._priority: set[str] = set()
+        self._clock = SteamClock()
+        self._inventory_backend = inventory_backend
+        self._inventories = inventory_cache
+        self._inventory_ttl = inventory_cache_ttl
+        self._sessions = (
+            session_cache if session_cache is not None else SessionCache(metrics=self._metrics)
+        )
+        self._session_locks: WeakValueDictionary[str, asyncio.Lock] = WeakValueDictionary()
         self._creds = TradeCredentialsCache.load(path=Path("data/trade.json"))
 
-    async def close_session(self, account: Account) -> None:
-        session = self._sessions.pop(account.username, None)
+    async def close_session(self, account: Account, invalidate: bool = False) -> None:
+        if invalidate and self._store is not None:
+            self._store.delete(account.username)
+        session = self._sessions.pop(account.username)
         if session:
             await session.close()
             logger.debug(f"{account.username} | Session closed")
 
+    def prioritize(self, accounts: list[Account]) -> None:
+        self._priority.update(a.username for a in accounts)
+
+    def pinned(self, account: Account):
+        return self._sessions.pinned(account.username)
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        return {
+            "live": len(self._sessions),
+            "hits": self._sessions.hits,
+            "misses": self._sessions.misses,
+            "evictions": self._sessions.evictions,
+        }
+
+    async def close(self) -> None:
+        if self._inventories is not None:
+            self._inventories.save()
+        await self._sessions.clear()
+        await self._clients.aclose()
+        if self._store is not None:
+            await self._store.close()
+        logger.debug(
+            "Session cache | " + " | ".join(f"{k}={v}" for k, v in self.cache_stats.items())
+        )
+
+    @staticmethod
+    def is_session_fault(ex: Exception) -> bool:
+        if isinstance(ex, (AuthorizationError, InvalidConfirmationPageError)):
+            return True
+        if isinstance(ex, HTTPStatusError):
+            return ex.response.status_code in (401, 403)
+        return False
+
+    def _stage(self, name: str, account: Account):
+        return self._metrics.stage(
+            name=name,
+            account=account.username,
+            proxy=account.proxy.address if account.proxy else None,
+        )
+
+    def _observe(
+        self,
+        name: str,
+        started: float,
+        account: Account,
+        error: Exception | None = None,
+    ):
+        self._metrics.observe(
+            name=name,
+            seconds=perf_counter() - started,
+            account=account.username,
+            proxy=account.proxy.address if account.proxy else None,
+            error=error,
+        )
+
     async def _session(self, account: Account) -> SteamAccount:
-        if account.username in self._sessions:
-            return self._sessions[account.username]
+        await self._sessions.evict()
+        if (lock := self._session_locks.get(account.username)) is None:
+            lock = self._session_locks[account.username] = asyncio.Lock()
+        async with lock:
+            return await self._open_session(account)
+
+    async def _open_session(self, account: Account) -> SteamAccount:
+        proxy = account.proxy.to_format() if account.proxy else None
+        if session := self._sessions.get(account.username):
+            if session.proxy != proxy:
+                logger.debug(f"{account.username} | Switching session proxy")
+                await session.set_proxy(proxy)
+            expires_at = session.access_token_expires_at
+            if expires_at is None or expires_at >= time() + 60:
+                return session
+            try:
+                await self._refresh(session, account)
+                return session
+            except Exception as ex:
+                logger.warning(
+                    f"{account.username} | {ex.__class__.__name__} | "
+                    f"Access token renewal failed, logging in again"
+                )
+                await self.close_session(account, invalidate=True)
 
-        logger.debug(f"{account.username} | Logging in to Steam")
         session = SteamAccount(
             username=account.username,
             password=account.password,
             shared_secret=account.secrets.shared_secret,
             identity_secret=account.secrets.identity_secret,
-            proxy=account.proxy.to_format() if account.proxy else None,
+            proxy=proxy,
+            clock=self._clock,
+            client_factory=self._clients,
+            inventory_backend=self._inventory_backend,
         )
-        await session.login()
-        self._sessions[account.username] = session
-        logger.debug(f"{account.username} | Logged in successfully")
+        if not await self._restore(session, account):
+            await self._login(session, account)
+            if self._store is not None:
+                self._store.set(account.username, session.export_session())
+            logger.debug(f"{account.username} | Logged in successfully")
+        await self._sessions.put(account.username, session)
         return session
 
+    async def warm_up(self, account: Account) -> None:
+        async with self.pinned(account):
+            await self._session(account)
+
+    async def _login(self, session: SteamAccount, account: Account) -> None:
+        key = account.proxy.address if account.proxy else ""
+        priority = 0 if account.username in self._priority else 1
+        for attempt in range(1, self.LOGIN_ATTEMPTS + 1):
+            try:
+                async with self._governor.admit(key=key, priority=priority):
+                    logger.debug(f"{account.username} | Logging in to Steam")
+                    with self._stage("login", account):
+                        await session.authenticate()
+                return
+            except Exception as ex:
+                if attempt == self.LOGIN_ATTEMPTS or "Unsupported confirmation" in str(ex):
+                    raise
+                logger.warning(
+                    f"{account.username} | {ex.__class__.__name__} | Login failed, retrying"
+                )
+
+    async def _restore(self, session: SteamAccount, account: Account) -> bool:
+        if self._store is None or (stored := self._store.get(account.username)) is None:
+            return False
+        with self._stage("restore", account):
+            restored = await session.restore_session(stored)
+        if restored:
+            logger.debug(f"{account.username} | Stored session restored")
+        else:
+            logger.debug(f"{account.username} | Stored session expired")
+            self._store.delete(account.username)
+        return restored
+
+    async def _refresh(self, session: SteamAccount, account: Account) -> None:
+        with self._stage("refresh", account):
+            await session.refresh_access_token()
+        if self._store is not None:
+            self._store.set(account.username, session.export_session())
+        logger.debug(f"{account.username} | Access token renewed")
+
+    async def keepalive(self, accounts: list[Account], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            for account in accounts:
+                session = self._sessions.peek(account.username)
+                if session is None or (expires_at := session.access_token_expires_at) is None:
+                    continue
+                if expires_at - time() > self.TOKEN_REFRESH_MARGIN:
+                    continue
+                try:
+                    await self._refresh(session, account)
+                except Exception as ex:
+                    logger.warning(
+                        f"{account.username} | {ex.__class__.__name__} | "
+                        f"Access token renewal failed"
+                    )
+
+    async def iter_inventory(
+        self,
+        account: Account,
+        app_id: int,
+        context_id: int,
+        cached: bool = False,
+    ) -> AsyncIterator[Inventory]:
+        async with self.pinned(account):
+            session = await self._session(account)
+            fetched = None
+            if cached and self._inventories is not None and self._inventory_ttl:
+                entry = self._inventories.get(
+                    session.steam_id64, app_id, context_id, ttl=self._inventory_ttl
+                )
+                if entry is not None:
+                    with self._stage("inventory_head", account):
+                        total, head = await session.fetch_inventory_head(
+                            app_id, context_id, count=self._inventories.HEAD_SIZE
+                        )
+                    if self._inventories.is_fresh(entry, total, head):
+                        logger.debug(f"{account.username} | Using cached inventory")
+                        self._metrics.increment("inventory_cache_hits")
+                        yield entry.items
+                        return
+                self._metrics.increment("inventory_cache_misses")
+                # The stale entry goes first so only one full copy is ever held.
+                self._inventories.discard(session.steam_id64, app_id, context_id)
+                fetched = Inventory(app_id=app_id, context_id=context_id)
+                # Freshness is judged against Steam's raw listing, untradable items included.
+                total, head = 0, []
+
+            pages = session.iter_inventory(app_id, context_id)
+            while True:
+                started = perf_counter()
+                try:
+                    page = await anext(pages, None)
+                except Exception as ex:
+                    self._observe("inventory_page", started, account, ex)
+                    raise
+                if page is None:
+                    break
+                self._observe("inventory_page", started, account)
+                if fetched is not None:
+                    fetched.extend(page)
+                    total += len(page.listed_ids)
+                    if len(head) < self._inventories.HEAD_SIZE:
+                        head.extend(page.listed_ids[:self._inventories.HEAD_SIZE - len(head)])
+                yield page
+
+            if fetched is not None:
+                self._inventories.set(
+                    username=account.username,
+                    steam_id64=session.steam_id64,
+                    app_id=app_id,
+                    context_id=context_id,
+                    items=fetched,
+                    total=total,
+                    head=head,
+                )
+
     async def fetch_inventory(
         self,
         account: Account,
         app_id: int,
         context_id: int,
-    ) -> list[Item]:
-        session = await self._session(account)
-        return await session.fetch_inventory(app_id, context_id)
+        cached: bool = False,
+    ) -> Inventory:
+        inventory = Inventory(app_id=app_id, context_id=context_id)
+        async for page in self.iter_inventory(account, app_id, context_id, cached=cached):
+            inventory.extend(page)
+        return inventory
+
+    def record_removed(
+        self,
+        account: Account,
+        app_id: int,
+        context_id: int,
+        assets: list[tuple[int, int]],
+    ) -> None:
+        if self._inventories is not None:
+            self._inventories.remove(account.username, app_id, context_id, assets)
 
     async def fetch_inventory_and_wallet(
         self,
         account: Account,
         app_id: int,
         context_id: int,
-    ) -> tuple[list[Item], float, int]:
-        session = await self._session(account)
-        items = await session.fetch_inventory(app_id, context_id)
-        wallet = await session.get_wallet()
+    ) -> tuple[Inventory, float, int]:
+        async with self.pinned(account):
+            session = await self._session(account)
+            with self._stage("inventory", account):
+                items = await session.fetch_inventory(app_id, context_id)
+            with self._stage("wallet", account):
+                wallet = await session.get_wallet()
         return items, float(wallet.total_balance), int(wallet.currency)
 
     async def get_trade_credentials(self, account: Account) -> tuple[int, str]:
@@ -66,8 +341,10 @@ class SteamService:
             return cached
         
         logger.debug(f"{account.username} | Fetching trade credentials")
-        session = await self._session(account)
-        token = await session.get_trade_token()
+        async with self.pinned(account):
+            session = await self._session(account)
+            with self._stage("trade_credentials", account):
+                token = await session.get_trade_token()
         self._creds.set(account.username, session.steam_id64, token)
         logger.debug(f"{account.username} | Trade credentials cached")
         return session.steam_id64, token
@@ -79,13 +356,25 @@ class SteamService:
         partner_steam_id64: int,
         partner_trade_token: str,
     ) -> int:
-        session = await self._session(sender)
-        return await session.send_trade_offer(
-            partner_steam_id64=partner_steam_id64,
-            partner_trade_token=partner_trade_token,
-            me=items,
-            them=[],
-        )
+        async with self.pinned(sender):
+            session = await self._session(sender)
+            if self._rate_limiter:
+                await self._rate_limiter.acquire(sender.username)
+            with self._stage("send_offer", sender):
+                response = await session.create_trade_offer(
+                    partner_steam_id64=partner_steam_id64,
+                    partner_trade_token=partner_trade_token,
+                    me=items,
+                    them=[],
+                )
+            if response.needs_mobile_confirmation:
+                with self._stage("mobile_confirm", sender):
+                    await self._confirmations.confirm(
+                        username=sender.username,
+                        get_session=lambda: self._session(sender),
+                        trade_offer_id=response.trade_offer_id,
+                    )
+        return response.trade_offer_id
 
     async def accept_trade_offer(
         self,
@@ -93,8 +382,10 @@ class SteamService:
         trade_offer_id: int,
         partner_steam_id64: int,
     ) -> None:
-        session = await self._session(acceptor)
-        await session.accept_trade_offer(
-            trade_offer_id=trade_offer_id,
-            partner_steam_id64=partner_steam_id64,
-        )
+        async with self.pinned(acceptor):
+            session = await self._session(acceptor)
+            with self._stage("accept", acceptor):
+                await session.accept_trade_offer(
+                    trade_offer_id=trade_offer_id,
+                    partner_steam_id64=partner_steam_id64,
+                )
@@ -1,3 +1,5 @@
+from httpx import AsyncClient
+
 from src.steamparse import (
     SteamParseClient,
     Game,
@@ -11,12 +13,14 @@ class SteamParseService:
         self,
         base_url: str,
         bearer_token: str | None = None,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        client: AsyncClient | None = None,
     ):
         self._client = SteamParseClient(
             base_url=base_url,
             bearer_token=bearer_token,
             timeout=timeout,
+            client=client,
         )
 
     async def close(self):
@@ -1,6 +1,12 @@
 from .account import (
     SteamAccount,
 )
+from .client import (
+    ClientFactory,
+    SharedTransport,
+)
+from .clock import SteamClock
+from .inventory import Inventory
 from .enums import (
     SteamURL,
     Currency,
@@ -31,15 +37,21 @@ from .schemas import (
     SendOfferResponse,
     AcceptOfferResponse,
     MobileConfirmation,
+    SessionData,
     Wallet,
 )
 
 __all__ = [
     "SteamAccount",
+    "SteamClock",
+    "ClientFactory",
+    "SharedTransport",
     "Item",
+    "Inventory",
     "SendOfferResponse",
     "AcceptOfferResponse",
     "MobileConfirmation",
+    "SessionData",
     "Wallet",
     "SteamURL",
     "Currency",
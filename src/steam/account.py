@@ -1,10 +1,17 @@
 import asyncio
 import json
 import re
+from collections.abc import AsyncIterator
 from time import time
+from urllib.parse import unquote
 
 from bs4 import BeautifulSoup
-from httpx import AsyncClient
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    HTTPStatusError,
+    TransportError,
+)
 from contextlib import suppress
 from tenacity import (
     retry,
@@ -13,6 +20,8 @@ from tenacity import (
     retry_if_exception,
 )
 
+from .client import ClientFactory
+from .clock import SteamClock
 from .enums import (
     SteamURL,
     Currency,
@@ -20,6 +29,7 @@ from .enums import (
 from .exceptions import (
     AuthorizationError,
     SetTokenError,
+    InventoryError,
     UnknownInventoryError,
     PrivateInventoryError,
     NullInventoryError,
@@ -37,6 +47,8 @@ from .exceptions import (
 )
 from .pb.enums_pb2 import k_ESessionPersistence_Persistent
 from .pb.steammessages_auth.steamclient_pb2 import (
+    CAuthentication_AccessToken_GenerateForApp_Request,
+    CAuthentication_AccessToken_GenerateForApp_Response,
     CAuthentication_BeginAuthSessionViaCredentials_Request,
     CAuthentication_BeginAuthSessionViaCredentials_Response,
     CAuthentication_GetPasswordRSAPublicKey_Request,
@@ -49,10 +61,12 @@ from .pb.steammessages_auth.steamclient_pb2 import (
     CAuthentication_PollAuthSessionStatus_Request,
     CAuthentication_PollAuthSessionStatus_Response,
 )
+from .inventory import Inventory
 from .schemas import (
     FinalizeLoginStatus,
     TransferInfoItem,
     LoginResult,
+    SessionData,
     Item,
     MobileConfirmation,
     SendOfferResponse,
@@ -60,8 +74,10 @@ from .schemas import (
     Wallet,
 )
 from .utils import (
+    decode_jwt_payload,
     generate_code,
     generate_sessionid,
+    parse_inventory,
     get_confirmation_hash,
     pbmessage_to_request,
     get_website_id_by_platform,
@@ -71,6 +87,10 @@ from .utils import (
 
 
 class SteamAccount:
+    INVENTORY_PAGE_SIZE = 2000
+    INVENTORY_MAX_DELAY = 60.0
+    INVENTORY_RATE_LIMIT_ATTEMPTS = 6
+
     def __init__(
         self,
         username: str,
@@ -79,6 +99,10 @@ class SteamAccount:
         identity_secret: str,
         *,
         proxy: str | None = None,
+        transport: AsyncBaseTransport | None = None,
+        clock: SteamClock | None = None,
+        client_factory: ClientFactory | None = None,
+        inventory_backend: str = "paginated",
         user_agent: str = (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
             "Chrome/141.0.0.0 Safari/537.36"
@@ -93,19 +117,30 @@ class SteamAccount:
         self._logged_in: bool = False
         self._steam_id64: int | None = None
         self._session_id: str | None = None
+        self._refresh_token: str | None = None
         self._trade_token: str | None = None
         self._currency: Currency | None = None
         self._timeout: float = 20.0
         self._user_agent = user_agent
-        self._client = AsyncClient(
+        self._owns_client_factory = client_factory is None
+        self._client_factory = client_factory or ClientFactory(transport=transport)
+        self._clock = clock or SteamClock()
+        self._inventory_backend = inventory_backend
+        self._inventory_delay = 0.0
+        self._proxy = proxy
+        self._client = self._build_client(proxy)
+
+    def _build_client(self, proxy: str | None) -> AsyncClient:
+        return self._client_factory.client(
+            proxy,
             headers={"User-Agent": self._user_agent},
             timeout=self._timeout,
-            proxy=proxy,
-            follow_redirects=True,
         )
 
     async def close(self):
         await self._client.aclose()
+        if self._owns_client_factory:
+            await self._client_factory.aclose()
 
     async def __aenter__(self):
         return self
@@ -133,6 +168,10 @@ class SteamAccount:
     def device_id(self) -> str | None:
         return self._device_id
 
+    @property
+    def proxy(self) -> str | None:
+        return self._proxy
+
     @property
     def logged_in(self) -> bool:
         return self._logged_in
@@ -145,6 +184,25 @@ class SteamAccount:
     def session_id(self) -> str | None:
         return self._session_id
 
+    @property
+    def refresh_token(self) -> str | None:
+        return self._refresh_token
+
+    @property
+    def access_token(self) -> str | None:
+        for cookie in self._client.cookies.jar:
+            if cookie.name == "steamLoginSecure":
+                return unquote(cookie.value).split("||")[-1]
+        return None
+
+    @property
+    def access_token_expires_at(self) -> int | None:
+        if (token := self.access_token) is None:
+            return None
+        with suppress(Exception):
+            return int(decode_jwt_payload(token)["exp"])
+        return None
+
     @property
     def trade_token(self) -> str | None:
         return self._trade_token
@@ -153,22 +211,110 @@ class SteamAccount:
     def currency(self) -> Currency | None:
         return self._currency
 
+    async def set_proxy(self, proxy: str | None):
+        client = self._build_client(proxy)
+        client.cookies = self._client.cookies
+        with suppress(Exception):
+            await self.close()
+        self._client = client
+        self._proxy = proxy
+
     async def reset(self, proxy: str | None = None):
         with suppress(Exception):
             await self.close()
-        self._client = AsyncClient(
-            headers={"User-Agent": self._user_agent},
-            timeout=self._timeout,
-            proxy=proxy,
-            follow_redirects=True,
-        )
+        self._client = self._build_client(proxy)
+        self._proxy = proxy
         self._logged_in = False
         self._steam_id64 = None
         self._session_id = None
+        self._refresh_token = None
         self._trade_token = None
         self._currency = None
         self._device_id = None
 
+    def export_session(self) -> SessionData | None:
+        if not self._logged_in:
+            return None
+        return SessionData(
+            steam_id64=self._steam_id64,
+            session_id=self._session_id,
+            refresh_token=self._refresh_token,
+            cookies={
+                cookie.domain: cookie.value
+                for cookie in self._client.cookies.jar
+                if cookie.name == "steamLoginSecure"
+            },
+        )
+
+    def _set_access_token(self, access_token: str):
+        value = f"{self._steam_id64}%7C%7C{access_token}"
+        cookies = [c for c in self._client.cookies.jar if c.name == "steamLoginSecure"]
+        for cookie in cookies:
+            cookie.value = value
+        if not cookies:
+            for domain in ["steamcommunity.com", "help.steampowered.com"]:
+                self._client.cookies.set("steamLoginSecure", value, domain=domain)
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_fixed(5),
+        retry=retry_if_exception(
+            lambda e: isinstance(e, TransportError)
+            or (isinstance(e, HTTPStatusError) and e.response.status_code >= 500)
+        ),
+        reraise=True,
+    )
+    async def refresh_access_token(self) -> str:
+        if self._refresh_token is None or self._steam_id64 is None:
+            raise AuthorizationError("No refresh token")
+
+        message = CAuthentication_AccessToken_GenerateForApp_Request(
+            refresh_token=self._refresh_token,
+            steamid=self._steam_id64,
+        )
+        response = await self._client.post(
+            url=f"{SteamURL.API.value}/IAuthenticationService/GenerateAccessTokenForApp/v1",
+            data={"input_protobuf_encoded": pbmessage_to_request(message)},
+        )
+        if response.status_code >= 500:
+            response.raise_for_status()
+        if not response.status_code == 200:
+            raise AuthorizationError
+        access_token = CAuthentication_AccessToken_GenerateForApp_Response.FromString(
+            response.content
+        ).access_token
+        if not access_token:
+            raise AuthorizationError("Access token renewal failed")
+
+        self._set_access_token(access_token)
+        return access_token
+
+    async def is_session_alive(self) -> bool:
+        response = await self._client.get(f"{SteamURL.COMMUNITY.value}/chat/clientjstoken")
+        if response.status_code != 200:
+            return False
+        data = response.json()
+        return bool(data.get("logged_in")) and int(data.get("steamid", 0)) == self._steam_id64
+
+    async def restore_session(self, data: SessionData) -> bool:
+        self._steam_id64 = data.steam_id64
+        self._session_id = data.session_id
+        self._refresh_token = data.refresh_token
+        self._transfer_cookie("sessionid", data.session_id)
+        for domain, value in data.cookies.items():
+            self._client.cookies.set("steamLoginSecure", value, domain=domain)
+
+        with suppress(Exception):
+            expires_at = self.access_token_expires_at
+            if expires_at is None or expires_at < time() + 60:
+                await self.refresh_access_token()
+            if await self.is_session_alive():
+                self._device_id = generate_device_id(self._steam_id64)
+                self._logged_in = True
+                return True
+        await self.reset(self._proxy)
+        return False
+
     async def _poll_auth_session_status(
         self,
         client_id: int,
@@ -276,6 +422,8 @@ class SteamAccount:
         )
         if not response.status_code == 200:
             raise AuthorizationError
+        if response.headers.get("x-eresult", "1") != "1":
+            raise AuthorizationError("Steam Guard code rejected")
         return CAuthentication_UpdateAuthSessionWithSteamGuardCode_Response.FromString(
             response.content
         )
@@ -290,10 +438,11 @@ class SteamAccount:
         ):
             raise AuthorizationError("Unsupported confirmation type")
 
+        await self._clock.ensure_synced(self._client)
         await self._update_auth_session_with_steam_guard(
             client_id=session.client_id,
             steamid=session.steamid,
-            code=generate_code(self._shared_secret),
+            code=generate_code(self._shared_secret, self._clock.now()),
             code_type=k_EAuthSessionGuardType_DeviceCode,
         )
         return
@@ -314,6 +463,9 @@ class SteamAccount:
         reraise=True,
     )
     async def login(self) -> LoginResult:
+        return await self.authenticate()
+
+    async def authenticate(self) -> LoginResult:
         if self._logged_in:
             raise AuthorizationError("Already logged in")
 
@@ -336,6 +488,7 @@ class SteamAccount:
         )
 
         tokens = await self._finalize_login(refresh_token=session_status.refresh_token)
+        self._refresh_token = session_status.refresh_token
         self._steam_id64 = int(tokens.steamID)
         await self._set_tokens(tokens.transfer_info)
         self._device_id = generate_device_id(self._steam_id64)
@@ -371,16 +524,78 @@ class SteamAccount:
             raise NullInventoryError(steam_id=self._steam_id64, app_id=app_id)
         return response.json()
 
-    async def fetch_inventory(
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_fixed(10),
+        retry=retry_if_exception(lambda e: not isinstance(e, InventoryError)),
+        reraise=True,
+    )
+    async def _get_inventory_assets_page(
         self,
         app_id: int,
         context_id: int,
-    ) -> list[Item]:
-        inventory = {
-            "rgInventory": {},
-            "rgDescriptions": {},
-        }
+        start_assetid: str | None,
+        count: int,
+    ) -> dict:
+        params = {"l": "english", "count": count}
+        if start_assetid:
+            params["start_assetid"] = start_assetid
+
+        for _ in range(self.INVENTORY_RATE_LIMIT_ATTEMPTS):
+            if self._inventory_delay:
+                await asyncio.sleep(self._inventory_delay)
+            response = await self._client.get(
+                url=f"{SteamURL.COMMUNITY.value}/inventory/{self._steam_id64}/{app_id}/{context_id}",
+                params=params,
+            )
+            if response.status_code != 429:
+                self._inventory_delay /= 2
+                if self._inventory_delay < 0.5:
+                    self._inventory_delay = 0.0
+                break
+            self._inventory_delay = min(
+                max(self._inventory_delay * 2, 1.0), self.INVENTORY_MAX_DELAY
+            )
+
+        if response.status_code == 403:
+            raise PrivateInventoryError(steam_id=self._steam_id64, app_id=app_id)
+        response.raise_for_status()
+        if response.text == "null":
+            raise NullInventoryError(steam_id=self._steam_id64, app_id=app_id)
+        data = response.json()
+        if not data.get("success"):
+            raise UnknownInventoryError(steam_id=self._steam_id64, app_id=app_id)
+        return data
+
+    async def _iter_inventory_paginated(
+        self,
+        app_id: int,
+        context_id: int,
+    ) -> AsyncIterator[Inventory]:
+        start_assetid = None
+        while True:
+            page = await self._get_inventory_assets_page(
+                app_id=app_id,
+                context_id=context_id,
+                start_assetid=start_assetid,
+                count=self.INVENTORY_PAGE_SIZE,
+            )
+            yield parse_inventory(
+                assets=page.get("assets", []),
+                descriptions=page.get("descriptions", []),
+                app_id=int(app_id),
+                context_id=int(context_id),
+            )
+            if not page.get("more_items"):
+                break
+            start_assetid = page["last_assetid"]
 
+    async def _iter_inventory_legacy(
+        self,
+        app_id: int,
+        context_id: int,
+    ) -> AsyncIterator[Inventory]:
+        descriptions = {}
         start = 0
         while True:
             response = await self._get_inventory_page(app_id, context_id, start)
@@ -391,40 +606,52 @@ class SteamAccount:
                 if error == "This profile is private.":
                     raise PrivateInventoryError(steam_id=self.steam_id64, app_id=app_id)
 
-            inventory["rgInventory"].update(response["rgInventory"])
-            inventory["rgDescriptions"].update(response["rgDescriptions"])
+            descriptions.update(response.get("rgDescriptions") or {})
+            yield parse_inventory(
+                assets=(response.get("rgInventory") or {}).values(),
+                descriptions=descriptions.values(),
+                app_id=int(app_id),
+                context_id=int(context_id),
+            )
             if response.get("more"):
                 start = response["more_start"]
                 await asyncio.sleep(30)
             else:
                 break
 
-        items = []
-        if not inventory.get("rgInventory"):
-            return items
-        for asset in inventory.get("rgInventory").values():
-            class_id = asset["classid"]
-            description = next(
-                (x for x in inventory.get("rgDescriptions").values() if x["classid"] == class_id),
-                None,
-            )
-            name = description["name"]
-            market_hash_name = description["market_hash_name"]
-            amount = asset["amount"]
-            asset_id = asset["id"]
-            class_id = asset["classid"]
-            items.append(
-                Item(
-                    name=name,
-                    market_hash_name=market_hash_name,
-                    app_id=int(app_id),
-                    context_id=int(context_id),
-                    amount=int(amount),
-                    asset_id=int(asset_id),
-                    class_id=int(class_id),
-                )
-            )
-        return items
+    async def fetch_inventory_head(
+        self,
+        app_id: int,
+        context_id: int,
+        count: int = 100,
+    ) -> tuple[int | None, list[int]]:
+        if self._inventory_backend != "paginated":
+            response = await self._get_inventory_page(app_id, context_id, 0)
+            head = [int(asset["id"]) for asset in (response.get("rgInventory") or {}).values()]
+            return (None if response.get("more") else len(head)), head
+        page = await self._get_inventory_assets_page(
+            app_id=app_id,
+            context_id=context_id,
+            start_assetid=None,
+            count=count,
+        )
+        head = [int(asset["assetid"]) for asset in page.get("assets", [])]
+        return int(page.get("total_inventory_count", len(head))), head
+
+    def iter_inventory(self, app_id: int, context_id: int) -> AsyncIterator[Inventory]:
+        if self._inventory_backend == "paginated":
+            return self._iter_inventory_paginated(app_id, context_id)
+        return self._iter_inventory_legacy(app_id, context_id)
+
+    async def fetch_inventory(
+        self,
+        app_id: int,
+        context_id: int,
+    ) -> Inventory:
+        inventory = Inventory(app_id=int(app_id), context_id=int(context_id))
+        async for page in self.iter_inventory(app_id, context_id):
+            inventory.extend(page)
+        return inventory
 
     @retry(
         stop=stop_after_attempt(3),
@@ -455,7 +682,8 @@ class SteamAccount:
         reraise=True,
     )
     async def get_mobile_confirmations(self) -> list[MobileConfirmation]:
-        server_time = int(time())
+        await self._clock.ensure_synced(self._client)
+        server_time = self._clock.now()
         confirmation_hash = get_confirmation_hash(
             identity_secret=self._identity_secret,
             tag="conf",
@@ -504,7 +732,8 @@ class SteamAccount:
         reraise=True,
     )
     async def mobile_confirm(self, confirmation: MobileConfirmation):
-        server_time = int(time())
+        await self._clock.ensure_synced(self._client)
+        server_time = self._clock.now()
         confirmation_hash = get_confirmation_hash(
             identity_secret=self._identity_secret,
             tag="allow",
@@ -529,6 +758,38 @@ class SteamAccount:
         if success is not True:
             raise MobileConfirmationError
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_fixed(10),
+        reraise=True,
+    )
+    async def mobile_confirm_many(self, confirmations: list[MobileConfirmation]):
+        await self._clock.ensure_synced(self._client)
+        server_time = self._clock.now()
+        confirmation_hash = get_confirmation_hash(
+            identity_secret=self._identity_secret,
+            tag="allow",
+            server_time=server_time,
+        )
+        data = {
+            "op": "allow",
+            "p": self._device_id,
+            "a": self._steam_id64,
+            "k": confirmation_hash,
+            "t": server_time,
+            "m": "android",
+            "tag": "allow",
+            "cid[]": [confirmation.confirmation_id for confirmation in confirmations],
+            "ck[]": [confirmation.confirmation_key for confirmation in confirmations],
+        }
+        response = await self._client.post(
+            url=f"{SteamURL.COMMUNITY.value}/mobileconf/multiajaxop",
+            data=data,
+        )
+        success = response.json()["success"]
+        if success is not True:
+            raise MobileConfirmationError
+
     async def mobile_confirm_by_trade_offer_id(self, trade_offer_id: int):
         confirmations = await self.get_mobile_confirmations()
         for confirmation in confirmations:
@@ -541,13 +802,13 @@ class SteamAccount:
         wait=wait_fixed(10),
         reraise=True,
     )
-    async def send_trade_offer(
+    async def create_trade_offer(
         self,
         partner_steam_id64: int,
         partner_trade_token: str,
         me: list[Item] = None,
         them: list[Item] = None,
-    ) -> int:
+    ) -> SendOfferResponse:
         data = {
             "sessionid": self._session_id,
             "serverid": 1,
@@ -615,7 +876,21 @@ class SteamAccount:
                     raise exc(message)
             raise TradeError(error)
 
-        offer_response = SendOfferResponse.model_validate(data)
+        return SendOfferResponse.model_validate(data)
+
+    async def send_trade_offer(
+        self,
+        partner_steam_id64: int,
+        partner_trade_token: str,
+        me: list[Item] = None,
+        them: list[Item] = None,
+    ) -> int:
+        offer_response = await self.create_trade_offer(
+            partner_steam_id64=partner_steam_id64,
+            partner_trade_token=partner_trade_token,
+            me=me,
+            them=them,
+        )
         if offer_response.needs_mobile_confirmation:
             await self.mobile_confirm_by_trade_offer_id(offer_response.trade_offer_id)
         return offer_response.trade_offer_id
@@ -0,0 +1,79 @@
+import ssl
+from importlib.util import find_spec
+
+import certifi
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    AsyncHTTPTransport,
+    Limits,
+    Request,
+    Response,
+)
+
+
+class SharedTransport(AsyncBaseTransport):
+    """Lets many clients use one pool; closing a client leaves the pool open."""
+
+    def __init__(self, transport: AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: Request) -> Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        pass
+
+
+class ClientFactory:
+    def __init__(
+        self,
+        *,
+        transport: AsyncBaseTransport | None = None,
+        http2: bool = False,
+        limits: Limits = Limits(max_connections=100, max_keepalive_connections=20),
+    ):
+        if http2 and find_spec("h2") is None:
+            raise ImportError("HTTP/2 requires the h2 package (pip install httpx[http2])")
+        self._transport = transport
+        self._http2 = http2
+        self._limits = limits
+        self._ssl_context: ssl.SSLContext | None = None
+        self._pools: dict[str | None, AsyncBaseTransport] = {}
+
+    def _pool(self, proxy: str | None) -> AsyncBaseTransport:
+        if self._transport is not None:
+            return self._transport
+        if proxy not in self._pools:
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+            self._pools[proxy] = AsyncHTTPTransport(
+                verify=self._ssl_context,
+                http2=self._http2,
+                limits=self._limits,
+                proxy=proxy,
+            )
+        return self._pools[proxy]
+
+    def client(
+        self,
+        proxy: str | None = None,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float = 20.0,
+    ) -> AsyncClient:
+        return AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            transport=SharedTransport(self._pool(proxy)),
+            follow_redirects=True,
+        )
+
+    @property
+    def pool_count(self) -> int:
+        return len(self._pools)
+
+    async def aclose(self):
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            await pool.aclose()
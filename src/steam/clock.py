@@ -0,0 +1,47 @@
+import asyncio
+from time import (
+    monotonic,
+    time,
+)
+
+from httpx import AsyncClient
+
+from .enums import SteamURL
+
+
+class SteamClock:
+    def __init__(self, refresh_interval: float = 3600.0, retry_interval: float = 60.0):
+        self._refresh_interval = refresh_interval
+        self._retry_interval = retry_interval
+        self._offset = 0.0
+        self._next_sync = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def offset(self) -> float:
+        return self._offset
+
+    def now(self) -> int:
+        return int(time() + self._offset)
+
+    async def sync(self, client: AsyncClient):
+        started = time()
+        response = await client.post(
+            url=f"{SteamURL.API.value}/ITwoFactorService/QueryTime/v0001",
+            data={"steamid": "0"},
+        )
+        response.raise_for_status()
+        server_time = int(response.json()["response"]["server_time"])
+        self._offset = server_time - (started + time()) / 2
+        self._next_sync = monotonic() + self._refresh_interval
+
+    async def ensure_synced(self, client: AsyncClient):
+        if monotonic() < self._next_sync:
+            return
+        async with self._lock:
+            if monotonic() < self._next_sync:
+                return
+            try:
+                await self.sync(client)
+            except Exception:
+                self._next_sync = monotonic() + self._retry_interval
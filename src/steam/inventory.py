@@ -0,0 +1,114 @@
+from array import array
+from collections.abc import Iterable
+
+from .schemas import Item
+
+
+class Inventory:
+    """Inventory items stored column-wise, with names kept once in a shared table."""
+
+    def __init__(
+        self,
+        app_id: int,
+        context_id: int,
+        names: list[tuple[str, str]] | None = None,
+    ):
+        self.app_id = app_id
+        self.context_id = context_id
+        self.asset_ids = array("Q")
+        self.class_ids = array("Q")
+        self.amounts = array("L")
+        self.name_ids = array("L")
+        self.names: list[tuple[str, str]] = names if names is not None else []
+        # Every asset ID of a parsed page in Steam's order, including items dropped while parsing.
+        self.listed_ids = array("Q")
+        self._name_index = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.asset_ids)
+
+    def intern(self, name: str, market_hash_name: str) -> int:
+        key = (name, market_hash_name)
+        if (name_id := self._name_index.get(key)) is None:
+            name_id = self._name_index[key] = len(self.names)
+            self.names.append(key)
+        return name_id
+
+    def append(self, asset_id: int, class_id: int, amount: int, name_id: int):
+        self.asset_ids.append(asset_id)
+        self.class_ids.append(class_id)
+        self.amounts.append(amount)
+        self.name_ids.append(name_id)
+
+    def extend(self, other: "Inventory"):
+        remap = [self.intern(*name) for name in other.names]
+        self.asset_ids.extend(other.asset_ids)
+        self.class_ids.extend(other.class_ids)
+        self.amounts.extend(other.amounts)
+        self.name_ids.extend(remap[name_id] for name_id in other.name_ids)
+
+    def market_hash_name(self, row: int) -> str:
+        return self.names[self.name_ids[row]][1]
+
+    def item(self, row: int) -> Item:
+        name, market_hash_name = self.names[self.name_ids[row]]
+        return Item(
+            name=name,
+            market_hash_name=market_hash_name,
+            app_id=self.app_id,
+            context_id=self.context_id,
+            amount=self.amounts[row],
+            asset_id=self.asset_ids[row],
+            class_id=self.class_ids[row],
+        )
+
+    def to_items(self, rows: Iterable[int] | None = None) -> list[Item]:
+        return [self.item(row) for row in (range(len(self)) if rows is None else rows)]
+
+    def take(self, rows: Iterable[int]) -> "Inventory":
+        rows = list(rows)
+        taken = Inventory(self.app_id, self.context_id)
+        taken.names, taken._name_index = self.names, self._name_index
+        taken.asset_ids.extend(map(self.asset_ids.__getitem__, rows))
+        taken.class_ids.extend(map(self.class_ids.__getitem__, rows))
+        taken.amounts.extend(map(self.amounts.__getitem__, rows))
+        taken.name_ids.extend(map(self.name_ids.__getitem__, rows))
+        return taken
+
+    def without(self, asset_ids: set[int]) -> "Inventory":
+        return self.take(
+            row for row, asset_id in enumerate(self.asset_ids) if asset_id not in asset_ids
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "app_id": self.app_id,
+            "context_id": self.context_id,
+            "names": self.names,
+            "asset_ids": self.asset_ids.tolist(),
+            "class_ids": self.class_ids.tolist(),
+            "amounts": self.amounts.tolist(),
+            "name_ids": self.name_ids.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Inventory":
+        inventory = cls(
+            app_id=data["app_id"],
+            context_id=data["context_id"],
+            names=[tuple(name) for name in data["names"]],
+        )
+        inventory.asset_ids.fromlist(data["asset_ids"])
+        inventory.class_ids.fromlist(data["class_ids"])
+        inventory.amounts.fromlist(data["amounts"])
+        inventory.name_ids.fromlist(data["name_ids"])
+        return inventory
+
+    @classmethod
+    def coerce(cls, value) -> "Inventory":
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls.from_dict(value)
+        except (KeyError, TypeError) as ex:
+            raise ValueError(f"Unsupported inventory format: {ex!r}") from ex
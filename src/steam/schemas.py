@@ -31,6 +31,13 @@ class LoginResult(BaseModel):
     access_token: str
 
 
+class SessionData(BaseModel):
+    steam_id64: int
+    session_id: str
+    refresh_token: str | None = None
+    cookies: dict[str, str] = Field(default_factory=dict)
+
+
 class Item(BaseModel):
     name: str
     market_hash_name: str
@@ -1,13 +1,16 @@
 import base64
 import hmac
+import json
 import random
 import struct
 import time
+from collections.abc import Iterable
 from hashlib import sha1
 
 import rsa
 from google.protobuf.message import Message
 
+from .inventory import Inventory
 from .pb.steammessages_auth.steamclient_pb2 import (
     EAuthTokenPlatformType,
     k_EAuthTokenPlatformType_MobileApp,
@@ -43,8 +46,9 @@ def do_no_cache():
     return int(time.time() * 1000) - (18 * 60 * 60)
 
 
-def generate_code(shared_secret: str) -> str:
-    timestamp = int(time.time())
+def generate_code(shared_secret: str, timestamp: int | None = None) -> str:
+    if timestamp is None:
+        timestamp = int(time.time())
     time_buffer = struct.pack(">Q", timestamp // 30)
     time_hmac = hmac.new(base64.b64decode(shared_secret), time_buffer, digestmod=sha1).digest()
     begin = ord(time_hmac[19:20]) & 0xF
@@ -82,3 +86,38 @@ def encrypt_password(password: str, keys) -> str:
     public_key = rsa.PublicKey(n=publickey_mod, e=publickey_exp)
     encrypted_password = rsa.encrypt(message=password.encode("ascii"), pub_key=public_key)
     return str(base64.b64encode(encrypted_password), "utf8")
+
+
+def decode_jwt_payload(token: str) -> dict:
+    payload = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+
+def parse_inventory(
+    assets: Iterable[dict],
+    descriptions: Iterable[dict],
+    app_id: int,
+    context_id: int,
+) -> Inventory:
+    inventory = Inventory(app_id=app_id, context_id=context_id)
+    name_ids = {
+        (d["classid"], d.get("instanceid", "0")): inventory.intern(
+            d["name"], d["market_hash_name"]
+        )
+        for d in descriptions
+        if int(d.get("tradable", 1)) and int(d.get("marketable", 1))
+    }
+
+    for asset in assets:
+        asset_id = int(asset.get("assetid") or asset["id"])
+        inventory.listed_ids.append(asset_id)
+        class_id = asset["classid"]
+        if (name_id := name_ids.get((class_id, asset.get("instanceid", "0")))) is None:
+            continue
+        inventory.append(
+            asset_id=asset_id,
+            class_id=int(class_id),
+            amount=int(asset["amount"]),
+            name_id=name_id,
+        )
+    return inventory
@@ -0,0 +1,90 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.steam import Item
+from src.steam.utils import parse_inventory
+
+
+def make_inventory(assets: int, descriptions: int, seed: int = 0) -> tuple[dict, dict]:
+    rng = random.Random(seed)
+    rg_descriptions = {
+        f"{class_id}_0": {
+            "classid": str(class_id),
+            "instanceid": "0",
+            "name": f"Item #{class_id}",
+            "market_hash_name": f"Item #{class_id}",
+            "tradable": 1,
+            "marketable": int(rng.random() > 0.05),
+        }
+        for class_id in range(1, descriptions + 1)
+    }
+    rg_inventory = {}
+    for asset_id in range(1_000_000, 1_000_000 + assets):
+        rg_inventory[str(asset_id)] = {
+            "id": str(asset_id),
+            "classid": str(rng.randint(1, descriptions)),
+            "instanceid": "0",
+            "amount": "1",
+        }
+    return rg_inventory, rg_descriptions
+
+
+def parse_linear(rg_inventory: dict, rg_descriptions: dict) -> list[Item]:
+    items = []
+    for asset in rg_inventory.values():
+        description = next(
+            (x for x in rg_descriptions.values() if x["classid"] == asset["classid"]),
+            None,
+        )
+        items.append(
+            Item(
+                name=description["name"],
+                market_hash_name=description["market_hash_name"],
+                app_id=730,
+                context_id=2,
+                amount=int(asset["amount"]),
+                asset_id=int(asset["id"]),
+                class_id=int(asset["classid"]),
+            )
+        )
+    return items
+
+
+def measure(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(args: argparse.Namespace):
+    rg_inventory, rg_descriptions = make_inventory(args.assets, args.descriptions)
+    linear = measure(lambda: parse_linear(rg_inventory, rg_descriptions), args.repeat)
+    indexed = measure(
+        lambda: parse_inventory(
+            rg_inventory.values(), rg_descriptions.values(), app_id=730, context_id=2
+        ),
+        args.repeat,
+    )
+    parsed = parse_inventory(
+        rg_inventory.values(), rg_descriptions.values(), app_id=730, context_id=2
+    )
+    print(f"assets={args.assets} descriptions={args.descriptions} kept={len(parsed)}")
+    print(f"linear scan:   {linear * 1000:9.2f} ms")
+    print(f"indexed parse: {indexed * 1000:9.2f} ms")
+    print(f"speed-up:      {linear / indexed:9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inventory parsing micro-benchmark")
+    parser.add_argument("--assets", type=int, default=3000)
+    parser.add_argument("--descriptions", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from httpx import AsyncClient
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import Config
+from src.models import (
+    Account,
+    Proxy,
+    Secrets,
+)
+from src.orchestrator import TradeOrchestrator
+from src.services import (
+    ConfirmationService,
+    LoginGovernor,
+    MetricsService,
+    OptimizerService,
+    ProxyPool,
+    RateLimiterService,
+    SteamParseService,
+    SteamService,
+    TradePlanningService,
+)
+from tests.fake_steam import (
+    FakeSteam,
+    STEAMPARSE_URL,
+)
+
+
+def make_account(name: str, proxy: Proxy | None = None) -> Account:
+    return Account(
+        username=name,
+        password="password",
+        secrets=Secrets(
+            shared_secret=base64.b64encode(os.urandom(20)).decode(),
+            identity_secret=base64.b64encode(os.urandom(20)).decode(),
+        ),
+        proxy=proxy,
+    )
+
+
+async def main(args: argparse.Namespace):
+    fake = FakeSteam(
+        latency=(args.latency / 2, args.latency * 1.5),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        time_offset=args.time_offset,
+    )
+    proxies = [
+        Proxy(host=f"10.0.0.{i}", port=8000, username="user", password="pass")
+        for i in range(args.proxies)
+    ]
+    senders = [
+        make_account(f"sender{i}", proxies[i % len(proxies)])
+        for i in range(args.senders)
+    ]
+    acceptors = [make_account(f"acceptor{i}") for i in range(args.acceptors)]
+    for sender in senders:
+        fake.add_account(
+            sender.username, items=args.items, shared_secret=sender.secrets.shared_secret
+        )
+    for acceptor in acceptors:
+        fake.add_account(acceptor.username, shared_secret=acceptor.secrets.shared_secret)
+
+    Path("data").mkdir(exist_ok=True)
+    Path("data/acceptors.txt").write_text(
+        "".join(f"{a.username}:{a.password}\n" for a in acceptors), "utf-8"
+    )
+
+    config = Config.model_validate(
+        {
+            "ProgramSettings": {
+                "PerformTradeOfferAttempts": 2,
+                "SendTradesDelay": 1,
+                "SendTradesBurst": args.burst,
+                "Workers": args.workers,
+                "MaxOffersPerSender": args.offers_per_sender,
+                "PrefetchAcceptors": args.prefetch,
+                "WarmAcceptors": args.warm,
+            },
+            "TradeSettings": {"Target": args.target, "PlanningMode": args.planning_mode},
+            "SteamParse": {"URL": STEAMPARSE_URL, "Token": "token"},
+        }
+    )
+    metrics = MetricsService()
+    steam_service = SteamService(
+        rate_limiter=RateLimiterService(burst=args.burst, refill_interval=1),
+        confirmations=ConfirmationService(poll_interval=args.confirmation_interval),
+        transport=fake,
+        metrics=metrics,
+        login_governor=LoginGovernor(
+            concurrency=args.login_concurrency,
+            per_minute=args.logins_per_minute,
+            per_minute_per_proxy=args.logins_per_minute_per_proxy,
+        ),
+    )
+    steamparse_service = SteamParseService(
+        base_url=STEAMPARSE_URL,
+        client=AsyncClient(base_url=STEAMPARSE_URL, transport=fake),
+    )
+    orchestrator = TradeOrchestrator(
+        config=config,
+        senders=senders,
+        acceptors=acceptors,
+        steam_service=steam_service,
+        steamparse_service=steamparse_service,
+        trade_planning=TradePlanningService(
+            OptimizerService(overfill=config.trade_settings.overfill)
+        ),
+        proxies=ProxyPool(proxies),
+        metrics=metrics,
+    )
+
+    started = time.perf_counter()
+    await orchestrator.execute()
+    elapsed = time.perf_counter() - started
+
+    stats = orchestrator._results._tracker.get_stats()
+    print(f"acceptors: {stats.success} ok / {stats.errors} failed in {elapsed:.1f}s")
+    print(f"throughput: {stats.progress / elapsed * 60:.1f} acceptors/minute")
+    print(f"requests: {sum(fake.requests.values())}")
+    for route, count in fake.requests.most_common():
+        print(f"  {count:>6}  {route}")
+    print(metrics.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline orchestrator throughput benchmark")
+    parser.add_argument("--senders", type=int, default=10)
+    parser.add_argument("--acceptors", type=int, default=100)
+    parser.add_argument("--proxies", type=int, default=20)
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--target", type=float, default=5.0)
+    parser.add_argument("--planning-mode", choices=["greedy", "batch"], default="greedy")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--prefetch", type=int, default=4)
+    parser.add_argument("--warm", type=int, default=8)
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--offers-per-sender", type=int, default=2)
+    parser.add_argument("--confirmation-interval", type=float, default=0.5)
+    parser.add_argument("--login-concurrency", type=int, default=5)
+    parser.add_argument("--logins-per-minute", type=float, default=600)
+    parser.add_argument("--logins-per-minute-per-proxy", type=float, default=60)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--time-offset", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--log-level", default="WARNING")
+    arguments = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level=arguments.log_level)
+    os.chdir(tempfile.mkdtemp(prefix="steam-bench-"))
+    asyncio.run(main(arguments))
@@ -0,0 +1,491 @@
+import asyncio
+import base64
+import json
+import random
+import re
+import time
+from collections import Counter
+from urllib.parse import (
+    parse_qs,
+    unquote,
+)
+
+import rsa
+from httpx import (
+    AsyncBaseTransport,
+    Request,
+    Response,
+)
+
+from src.steam.utils import generate_code
+from src.steam.pb.steammessages_auth.steamclient_pb2 import (
+    CAuthentication_AccessToken_GenerateForApp_Request,
+    CAuthentication_AccessToken_GenerateForApp_Response,
+    CAuthentication_AllowedConfirmation,
+    CAuthentication_BeginAuthSessionViaCredentials_Request,
+    CAuthentication_BeginAuthSessionViaCredentials_Response,
+    CAuthentication_GetPasswordRSAPublicKey_Response,
+    CAuthentication_PollAuthSessionStatus_Request,
+    CAuthentication_PollAuthSessionStatus_Response,
+    CAuthentication_UpdateAuthSessionWithSteamGuardCode_Request,
+    CAuthentication_UpdateAuthSessionWithSteamGuardCode_Response,
+    k_EAuthSessionGuardType_DeviceCode,
+)
+
+STEAMPARSE_URL = "http://steamparse.local"
+
+
+class FakeOffer:
+    def __init__(self, offer_id: int, sender: int, partner: int, assets: list[int]):
+        self.offer_id = offer_id
+        self.sender = sender
+        self.partner = partner
+        self.assets = assets
+        self.confirmation_id = random.randint(10**9, 10**10)
+        self.confirmation_key = random.randint(10**9, 10**10)
+        self.confirmed = False
+        self.accepted = False
+
+
+class FakeSteam(AsyncBaseTransport):
+    """In-memory stand-in for the Steam web endpoints used by SteamAccount.
+
+    Also answers the SteamParse price dictionary and currency rate requests
+    on STEAMPARSE_URL, so a whole orchestrator run can be driven offline.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: tuple[float, float] = (0.0, 0.0),
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        catalog_size: int = 200,
+        page_size: int = 5000,
+        token_lifetime: int = 86400,
+        time_offset: int = 0,
+        seed: int = 0,
+    ):
+        self._random = random.Random(seed)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.page_size = page_size
+        self.token_lifetime = token_lifetime
+        self.time_offset = time_offset
+        self.requests: Counter[str] = Counter()
+        self.catalog = [
+            (class_id, f"Fake Item #{class_id}", round(self._random.lognormvariate(0, 1.2), 2))
+            for class_id in range(1, catalog_size + 1)
+        ]
+        self.steam_ids: dict[str, int] = {}
+        self.inventories: dict[int, dict[int, int]] = {}
+        self.wallets: dict[int, int] = {}
+        self.offers: dict[int, FakeOffer] = {}
+        self._public_key, _ = rsa.newkeys(512)
+        self._auth_sessions: dict[int, int] = {}
+        self._refresh_tokens: dict[str, int] = {}
+        self._shared_secrets: dict[int, str] = {}
+        self._next_asset_id = 1_000_000
+        self._next_offer_id = 5_000_000
+
+    @property
+    def prices(self) -> dict[str, float]:
+        return {name: price for _, name, price in self.catalog}
+
+    def add_account(
+        self,
+        username: str,
+        items: int = 0,
+        wallet: int = 0,
+        shared_secret: str | None = None,
+    ) -> int:
+        steam_id = 76561198000000000 + len(self.steam_ids)
+        self.steam_ids[username] = steam_id
+        if shared_secret is not None:
+            self._shared_secrets[steam_id] = shared_secret
+        self.inventories[steam_id] = {}
+        self.wallets[steam_id] = wallet
+        for _ in range(items):
+            self._next_asset_id += 1
+            class_id, _, _ = self._random.choice(self.catalog)
+            self.inventories[steam_id][self._next_asset_id] = class_id
+        return steam_id
+
+    async def handle_async_request(self, request: Request) -> Response:
+        route = f"{request.url.host}{request.url.path}"
+        self.requests[re.sub(r"\d{5,}", "{id}", route)] += 1
+        await request.aread()
+
+        low, high = self.latency
+        if high > 0:
+            await asyncio.sleep(self._random.uniform(low, high))
+        if self._random.random() < self.rate_limit_rate:
+            return Response(429, request=request)
+        if self._random.random() < self.error_rate:
+            return Response(500, text="", request=request)
+
+        for pattern, handler in self._routes():
+            if match := re.fullmatch(pattern, route):
+                response = handler(request, *match.groups())
+                response.request = request
+                return response
+        return Response(404, text="", request=request)
+
+    def _routes(self):
+        auth = r"api\.steampowered\.com/IAuthenticationService"
+        community = r"steamcommunity\.com"
+        return [
+            (rf"{auth}/GetPasswordRSAPublicKey/v1", self._rsa_key),
+            (rf"{auth}/BeginAuthSessionViaCredentials/v1", self._begin_auth),
+            (rf"{auth}/UpdateAuthSessionWithSteamGuardCode/v1", self._steam_guard),
+            (rf"{auth}/PollAuthSessionStatus/v1", self._poll_auth),
+            (rf"{auth}/GenerateAccessTokenForApp/v1", self._generate_access_token),
+            (r"api\.steampowered\.com/ITwoFactorService/QueryTime/v0001", self._query_time),
+            (r"login\.steampowered\.com/jwt/finalizelogin", self._finalize_login),
+            (r"(steamcommunity\.com|help\.steampowered\.com)/login/settoken", self._set_token),
+            (rf"{community}/profiles/(\d+)/inventory/json/(\d+)/(\d+)/", self._legacy_inventory),
+            (rf"{community}/inventory/(\d+)/(\d+)/(\d+)", self._inventory),
+            (rf"{community}/profiles/(\d+)/tradeoffers/privacy", self._trade_privacy),
+            (rf"{community}/market/", self._market),
+            (rf"{community}/chat/clientjstoken", self._client_js_token),
+            (rf"{community}/tradeoffer/new/send", self._send_offer),
+            (rf"{community}/tradeoffer/(\d+)/accept", self._accept_offer),
+            (rf"{community}/mobileconf/getlist", self._confirmations),
+            (rf"{community}/mobileconf/ajaxop", self._confirm),
+            (rf"{community}/mobileconf/multiajaxop", self._confirm_many),
+            (r"steamparse\.local/api/items/dictionary", self._price_dictionary),
+            (r"steamparse\.local/api/currency-rate", self._currency_rates),
+        ]
+
+    @staticmethod
+    def _form(request: Request) -> dict[str, list[str]]:
+        return parse_qs(request.content.decode())
+
+    @staticmethod
+    def _protobuf(request: Request, message_cls):
+        if request.method == "GET":
+            encoded = request.url.params["input_protobuf_encoded"]
+        else:
+            encoded = FakeSteam._form(request)["input_protobuf_encoded"][0]
+        return message_cls.FromString(base64.b64decode(encoded))
+
+    @staticmethod
+    def _current_user(request: Request) -> int | None:
+        cookies = request.headers.get("cookie", "")
+        if match := re.search(r"steamLoginSecure=(\d+)\|\|([\w.-]+)", unquote(cookies)):
+            payload = match.group(2).split(".")[1]
+            data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            if data["exp"] > time.time():
+                return int(match.group(1))
+        return None
+
+    @staticmethod
+    def _access_token(steam_id: int, lifetime: int = 86400) -> str:
+        def encode(data: dict) -> str:
+            return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+        header = encode({"typ": "JWT", "alg": "EdDSA"})
+        payload = encode({"sub": str(steam_id), "exp": int(time.time()) + lifetime})
+        return f"{header}.{payload}.signature"
+
+    def _rsa_key(self, request: Request) -> Response:
+        message = CAuthentication_GetPasswordRSAPublicKey_Response(
+            publickey_mod=format(self._public_key.n, "x"),
+            publickey_exp=format(self._public_key.e, "x"),
+            timestamp=int(time.time()),
+        )
+        return Response(200, content=message.SerializeToString())
+
+    def _begin_auth(self, request: Request) -> Response:
+        message = self._protobuf(request, CAuthentication_BeginAuthSessionViaCredentials_Request)
+        steam_id = self.steam_ids.get(message.account_name)
+        if steam_id is None:
+            return Response(400, content=b"")
+
+        client_id = self._random.randint(10**9, 10**10)
+        self._auth_sessions[client_id] = steam_id
+        response = CAuthentication_BeginAuthSessionViaCredentials_Response(
+            client_id=client_id,
+            request_id=self._random.randbytes(16),
+            steamid=steam_id,
+            interval=0.1,
+            allowed_confirmations=[
+                CAuthentication_AllowedConfirmation(
+                    confirmation_type=k_EAuthSessionGuardType_DeviceCode,
+                )
+            ],
+        )
+        return Response(200, content=response.SerializeToString())
+
+    def _server_time(self) -> int:
+        return int(time.time()) + self.time_offset
+
+    def _query_time(self, request: Request) -> Response:
+        return Response(200, json={"response": {"server_time": str(self._server_time())}})
+
+    def _steam_guard(self, request: Request) -> Response:
+        message = self._protobuf(
+            request, CAuthentication_UpdateAuthSessionWithSteamGuardCode_Request
+        )
+        if secret := self._shared_secrets.get(message.steamid):
+            now = self._server_time()
+            codes = {generate_code(secret, now + shift) for shift in (-30, 0, 30)}
+            if message.code not in codes:
+                self._auth_sessions.pop(message.client_id, None)
+                return Response(200, content=b"", headers={"x-eresult": "88"})
+        response = CAuthentication_UpdateAuthSessionWithSteamGuardCode_Response()
+        return Response(200, content=response.SerializeToString())
+
+    def _poll_auth(self, request: Request) -> Response:
+        message = self._protobuf(request, CAuthentication_PollAuthSessionStatus_Request)
+        steam_id = self._auth_sessions.pop(message.client_id, None)
+        if steam_id is None:
+            return Response(400, content=b"")
+
+        refresh_token = self._access_token(steam_id, lifetime=200 * 86400)
+        self._refresh_tokens[refresh_token] = steam_id
+        response = CAuthentication_PollAuthSessionStatus_Response(
+            refresh_token=refresh_token,
+            access_token=self._access_token(steam_id, self.token_lifetime),
+        )
+        return Response(200, content=response.SerializeToString())
+
+    def _generate_access_token(self, request: Request) -> Response:
+        message = self._protobuf(request, CAuthentication_AccessToken_GenerateForApp_Request)
+        if self._refresh_tokens.get(message.refresh_token) != message.steamid:
+            return Response(401, content=b"")
+        response = CAuthentication_AccessToken_GenerateForApp_Response(
+            access_token=self._access_token(message.steamid, self.token_lifetime),
+        )
+        return Response(200, content=response.SerializeToString())
+
+    def _finalize_login(self, request: Request) -> Response:
+        nonce = self._form(request)["nonce"][0]
+        steam_id = self._refresh_tokens.get(nonce)
+        if steam_id is None:
+            return Response(200, json={"success": False})
+
+        transfer_info = [
+            {
+                "url": f"https://{host}/login/settoken",
+                "params": {"nonce": nonce, "auth": "auth"},
+            }
+            for host in ("steamcommunity.com", "help.steampowered.com")
+        ]
+        return Response(
+            200,
+            json={
+                "steamID": str(steam_id),
+                "redir": "https://steamcommunity.com/login/home/?goto=",
+                "transfer_info": transfer_info,
+                "primary_domain": "steamcommunity.com",
+            },
+        )
+
+    def _set_token(self, request: Request, host: str) -> Response:
+        steam_id = self._form(request)["steamID"][0]
+        token = self._access_token(int(steam_id), self.token_lifetime)
+        return Response(
+            200,
+            json={"result": 1},
+            headers={
+                "Set-Cookie": f"steamLoginSecure={steam_id}%7C%7C{token}; Domain={host}; Path=/"
+            },
+        )
+
+    def _describe(self, class_id: int, app_id: str) -> dict:
+        _, name, _ = self.catalog[class_id - 1]
+        return {
+            "appid": app_id,
+            "classid": str(class_id),
+            "instanceid": "0",
+            "name": name,
+            "market_hash_name": name,
+            # Every tenth class is trade-held, as market purchases and medals are.
+            "tradable": int(class_id % 10 != 0),
+            "marketable": 1,
+        }
+
+    def _inventory(
+        self,
+        request: Request,
+        steam_id: str,
+        app_id: str,
+        context_id: str,
+    ) -> Response:
+        assets = sorted(self.inventories.get(int(steam_id), {}).items())
+        count = min(int(request.url.params.get("count", 75)), self.page_size)
+        start = request.url.params.get("start_assetid")
+        if start is not None:
+            assets = [(a, c) for a, c in assets if a > int(start)]
+        page, more = assets[:count], len(assets) > count
+        data = {"total_inventory_count": len(assets), "success": 1, "rwgrsn": -2}
+        if page:
+            data["assets"] = [
+                {
+                    "appid": int(app_id),
+                    "contextid": context_id,
+                    "assetid": str(asset_id),
+                    "classid": str(class_id),
+                    "instanceid": "0",
+                    "amount": "1",
+                }
+                for asset_id, class_id in page
+            ]
+            data["descriptions"] = [
+                self._describe(class_id, app_id) for class_id in {c for _, c in page}
+            ]
+        if more:
+            data["more_items"] = 1
+            data["last_assetid"] = str(page[-1][0])
+        return Response(200, json=data)
+
+    def _legacy_inventory(
+        self,
+        request: Request,
+        steam_id: str,
+        app_id: str,
+        context_id: str,
+    ) -> Response:
+        assets = sorted(self.inventories.get(int(steam_id), {}).items())
+        start = int(request.url.params.get("start", 0))
+        page = assets[start:start + self.page_size]
+        more = start + self.page_size < len(assets)
+        return Response(
+            200,
+            json={
+                "success": True,
+                # Steam sends empty lists rather than objects for an empty inventory.
+                "rgInventory": {
+                    str(asset_id): {
+                        "id": str(asset_id),
+                        "classid": str(class_id),
+                        "instanceid": "0",
+                        "amount": "1",
+                        "pos": start + pos + 1,
+                    }
+                    for pos, (asset_id, class_id) in enumerate(page)
+                } or [],
+                "rgDescriptions": {
+                    f"{class_id}_0": self._describe(class_id, app_id)
+                    for _, class_id in page
+                } or [],
+                "more": more,
+                "more_start": start + self.page_size if more else False,
+            },
+        )
+
+    def _trade_privacy(self, request: Request, steam_id: str) -> Response:
+        partner = int(steam_id) - 76561197960265728
+        url = f"https://steamcommunity.com/tradeoffer/new/?partner={partner}&token=fake{partner}"
+        return Response(
+            200,
+            text=f'<html><input id="trade_offer_access_url" value="{url}"></html>',
+        )
+
+    def _client_js_token(self, request: Request) -> Response:
+        steam_id = self._current_user(request)
+        if steam_id is None:
+            return Response(200, json={"logged_in": False})
+        return Response(200, json={"logged_in": True, "steamid": str(steam_id)})
+
+    def _market(self, request: Request) -> Response:
+        balance = self.wallets.get(self._current_user(request), 0)
+        wallet = {
+            "wallet_currency": 1,
+            "wallet_country": "US",
+            "wallet_balance": str(balance),
+            "wallet_delayed_balance": "0",
+        }
+        return Response(200, text=f"<script>var g_rgWalletInfo = {json.dumps(wallet)};</script>")
+
+    def _send_offer(self, request: Request) -> Response:
+        sender = self._current_user(request)
+        form = self._form(request)
+        offer = json.loads(form["json_tradeoffer"][0])
+        assets = [int(asset["assetid"]) for asset in offer["me"]["assets"]]
+        inventory = self.inventories.get(sender, {})
+        if not assets or any(asset_id not in inventory for asset_id in assets):
+            return Response(500, json={"strError": "There was an error sending your trade offer."})
+
+        self._next_offer_id += 1
+        self.offers[self._next_offer_id] = FakeOffer(
+            offer_id=self._next_offer_id,
+            sender=sender,
+            partner=int(form["partner"][0]),
+            assets=assets,
+        )
+        return Response(
+            200,
+            json={"tradeofferid": str(self._next_offer_id), "needs_mobile_confirmation": True},
+        )
+
+    def _accept_offer(self, request: Request, offer_id: str) -> Response:
+        offer = self.offers.get(int(offer_id))
+        acceptor = self._current_user(request)
+        if offer is None or not offer.confirmed or offer.partner != acceptor:
+            return Response(
+                500,
+                json={"strError": "There was an error accepting this trade offer."},
+            )
+
+        if not offer.accepted:
+            for asset_id in offer.assets:
+                class_id = self.inventories[offer.sender].pop(asset_id)
+                self.inventories[acceptor][asset_id] = class_id
+            offer.accepted = True
+        return Response(200, json={"tradeid": str(offer.offer_id * 7)})
+
+    def _confirmations(self, request: Request) -> Response:
+        steam_id = int(request.url.params["a"])
+        conf = [
+            {
+                "id": str(offer.confirmation_id),
+                "nonce": str(offer.confirmation_key),
+                "creator_id": str(offer.offer_id),
+            }
+            for offer in self.offers.values()
+            if offer.sender == steam_id and not offer.confirmed
+        ]
+        return Response(200, json={"success": True, "conf": conf})
+
+    def _confirm_ids(self, ids: list[str], keys: list[str]) -> bool:
+        pairs = {(int(cid), int(ck)) for cid, ck in zip(ids, keys)}
+        for offer in self.offers.values():
+            if (offer.confirmation_id, offer.confirmation_key) in pairs:
+                offer.confirmed = True
+                pairs.discard((offer.confirmation_id, offer.confirmation_key))
+        return not pairs
+
+    def _confirm(self, request: Request) -> Response:
+        params = request.url.params
+        success = self._confirm_ids([params["cid"]], [params["ck"]])
+        return Response(200, json={"success": success})
+
+    def _confirm_many(self, request: Request) -> Response:
+        form = self._form(request)
+        success = self._confirm_ids(form.get("cid[]", []), form.get("ck[]", []))
+        return Response(200, json={"success": success})
+
+    def _price_dictionary(self, request: Request) -> Response:
+        return Response(
+            200,
+            json={
+                "result": self.prices,
+                "isError": False,
+                "timeGenerated": "2025-01-01T00:00:00Z",
+            },
+        )
+
+    def _currency_rates(self, request: Request) -> Response:
+        return Response(
+            200,
+            json={
+                "result": [
+                    {"currencyType": 5, "rateToUSD": 80.0, "updatedAt": "2025-01-01T00:00:00Z"},
+                ],
+                "isError": False,
+                "timeGenerated": "2025-01-01T00:00:00Z",
+            },
+        )